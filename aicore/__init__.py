@@ -8,9 +8,24 @@ with support for both synchronous and asynchronous operations.
 """
 
 from aicore.config import Config
-from aicore.llm import Llm, LlmConfig
-from aicore.embeddings import Embeddings, EmbeddingsConfig
+from aicore.llm.config import LlmConfig
+from aicore.embeddings.config import EmbeddingsConfig
 from aicore.logger import Logger, _logger
+import importlib
+
+# Llm and Embeddings pull every provider sdk, only import them when first accessed
+_LAZY_IMPORTS = {
+    "Llm": "aicore.llm",
+    "Embeddings": "aicore.embeddings"
+}
+
+def __getattr__(name :str):
+    module = _LAZY_IMPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
 
 __all__ = [
     "Config",
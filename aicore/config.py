@@ -1,13 +1,59 @@
 
-from aicore.const import DEFAULT_CONFIG_PATH
-from aicore.embeddings import EmbeddingsConfig
-from aicore.llm import LlmConfig
+from aicore.const import DEFAULT_CONFIG_PATH, MAX_CONFIG_BYTES, SKIP_VALIDATION
+from aicore.embeddings.config import EmbeddingsConfig
+from aicore.llm.config import LlmConfig
 from pydantic import BaseModel
-from typing import Optional, Union
+from typing import Dict, Mapping, Optional, Tuple, Union
 from pathlib import Path
+import copy
 import yaml
 import os
 
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+_CONFIG_SCALAR_TAGS = frozenset({
+    "tag:yaml.org,2002:bool",
+    "tag:yaml.org,2002:int",
+    "tag:yaml.org,2002:float",
+    "tag:yaml.org,2002:null",
+    "tag:yaml.org,2002:merge"
+})
+
+class _ConfigLoader(_YamlLoader):
+    """Loader restricted to the implicit scalar types used by aicore configs (skips timestamp/value resolvers)"""
+
+_ConfigLoader.yaml_implicit_resolvers = {
+    first_char: [(tag, regexp) for tag, regexp in resolvers if tag in _CONFIG_SCALAR_TAGS]
+    for first_char, resolvers in _YamlLoader.yaml_implicit_resolvers.items()
+}
+
+_EMBEDDINGS_REQUIRED_ENV = ("EMBEDDINGS_PROVIDER", "EMBEDDINGS_API_KEY", "EMBEDDINGS_MODEL")
+_LLM_REQUIRED_ENV = ("LLM_PROVIDER", "LLM_API_KEY", "LLM_MODEL")
+_OPTIONAL_ENV = ("EMBEDDINGS_BASE_URL", "LLM_BASE_URL", "LLM_TEMPERATURE", "LLM_MAX_TOKENS")
+_ENV_KEYS = _EMBEDDINGS_REQUIRED_ENV + _LLM_REQUIRED_ENV + _OPTIONAL_ENV
+
+# resolved path -> (mtime_ns, size, parsed yaml), an edited file replaces its entry
+_YAML_CACHE: Dict[str, Tuple[int, int, Dict]] = {}
+
+def _detach_extras(config: Optional[BaseModel]):
+    """Validation keeps extra fields by reference to the cached yaml, providers update some in place (i.e extra_headers)"""
+    if config is None:
+        return
+    if config.__pydantic_extra__:
+        config.__pydantic_extra__ = copy.deepcopy(config.__pydantic_extra__)
+    _detach_extras(getattr(config, "reasoner", None))
+
+def set_default_config_path(config_path: Union[str, Path]):
+    """
+    Override the path used by Config.from_yaml when no path is passed.
+    CONFIG_PATH is only read once at import, use this to change it at runtime.
+    """
+    global DEFAULT_CONFIG_PATH
+    DEFAULT_CONFIG_PATH = config_path
+
 class Config(BaseModel):
     embeddings: EmbeddingsConfig = None
     llm: LlmConfig = None
@@ -18,38 +64,82 @@ class Config(BaseModel):
         Load configuration from a YAML file.
         
         Args:
-            config_path: Path to the YAML configuration file. If None, it will try to use
-                        the CONFIG_PATH environment variable or the default path.
+            config_path: Path to the YAML configuration file. If None, it will use the
+                        CONFIG_PATH environment variable (resolved at import), the path set
+                        through set_default_config_path or the default path.
                         
         Returns:
             Config: Configuration object with settings from the YAML file.
             
         Raises:
             FileNotFoundError: If the configuration file doesn't exist.
+            ValueError: If the configuration file exceeds MAX_CONFIG_BYTES.
         """
         if config_path is None:
             config_path = DEFAULT_CONFIG_PATH
-        config_path = Path(config_path)
+        config_path = Path(config_path).resolve()
 
-        if not os.path.exists(config_path):
-            raise FileNotFoundError(f"Configuration file not found: {config_path}. Please ensure the file exists and the path is correct.")
-        
-        with open(config_path, "r") as _file:
-            yaml_config = yaml.safe_load(_file)
+        try:
+            stat = os.stat(config_path)
+            cache_key = str(config_path)
+            cached = _YAML_CACHE.get(cache_key)
+            if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+                yaml_config = cached[2]
+            else:
+                if stat.st_size > MAX_CONFIG_BYTES:
+                    raise ValueError(f"Configuration file {config_path} is {stat.st_size} bytes, exceeding the {MAX_CONFIG_BYTES} bytes limit (AICORE_MAX_CONFIG_BYTES).")
+                # configs are small, slurp the raw bytes and let libyaml scan the buffer directly
+                yaml_config = yaml.load(config_path.read_bytes(), Loader=_ConfigLoader)
 
-        # Set default observability settings if not provided
-        if 'observability' not in yaml_config:
-            yaml_config['observability'] = {}
-            
-        return cls(**yaml_config)
+                # Set default observability settings if not provided
+                if 'observability' not in yaml_config:
+                    yaml_config['observability'] = {}
+                _YAML_CACHE[cache_key] = (stat.st_mtime_ns, stat.st_size, yaml_config)
+        except FileNotFoundError as e:
+            raise FileNotFoundError(f"Configuration file not found: {config_path}. Please ensure the file exists and the path is correct.") from e
+
+        # providers may mutate nested config values (i.e extra_headers), keep the cached dict pristine
+        if SKIP_VALIDATION:
+            # model_construct stores every value by reference
+            return cls.construct_from_yaml(copy.deepcopy(yaml_config))
+        # validation rebuilds the declared fields, only the extras still point into the cache
+        config = cls(**yaml_config)
+        _detach_extras(config.llm)
+        _detach_extras(config.embeddings)
+        return config
+
+    @classmethod
+    def construct_from_yaml(cls, yaml_config: Dict) -> "Config":
+        """
+        Build a Config from a trusted yaml dict skipping full pydantic validation.
+        Used by from_yaml when AICORE_SKIP_VALIDATION=1 is set.
+
+        Args:
+            yaml_config: Parsed yaml configuration.
+
+        Returns:
+            Config: Configuration object built with model_construct.
+        """
+        embeddings_config = yaml_config.get("embeddings")
+        llm_config = yaml_config.get("llm")
+        return cls.model_construct(
+            embeddings=EmbeddingsConfig.construct_trusted(embeddings_config) if embeddings_config else None,
+            llm=LlmConfig.construct_trusted(llm_config) if llm_config else None
+        )
     
     @staticmethod
-    def get_env_var(key: str, required: bool = True) -> Optional[str]:
-        value = os.getenv(key)
+    def get_env_var(key: str, required: bool = True, env: Optional[Mapping[str, str]] = None) -> Optional[str]:
+        value = (env if env is not None else os.environ).get(key)
         if required and not value:
             raise ValueError(f"Environment variable {key} is required but not set or empty.")
         return value
     
+    @staticmethod
+    def _raise_on_missing_env(values: Mapping[str, Optional[str]], required_keys: Tuple[str, ...]):
+        missing = [key for key in required_keys if not values[key]]
+        if missing:
+            raise ValueError(f"Environment variables {missing} are required but not set or empty.")
+
     @classmethod
     def from_environment(cls) -> "Config":
         """
@@ -67,35 +157,31 @@ class Config(BaseModel):
         Raises:
             ValueError: If any required environment variable is missing or empty.
         """
+        env = os.environ
+        values = {key: env.get(key) for key in _ENV_KEYS}
         obj = cls()
 
-        embeddings_required_keys = ["EMBEDDINGS_PROVIDER", "EMBEDDINGS_API_KEY", "EMBEDDINGS_MODEL"]
-        embeddings_values = {key: cls.get_env_var(key, required=False) for key in embeddings_required_keys}
-        
-        if all(not value for value in embeddings_values.values()):
-            embeddings_config = None
-        else:
+        embeddings_config = None
+        if any(values[key] for key in _EMBEDDINGS_REQUIRED_ENV):
+            cls._raise_on_missing_env(values, _EMBEDDINGS_REQUIRED_ENV)
             embeddings_config = EmbeddingsConfig(
-                provider=embeddings_values["EMBEDDINGS_PROVIDER"],
-                api_key=embeddings_values["EMBEDDINGS_API_KEY"],
-                model=embeddings_values["EMBEDDINGS_MODEL"],
-                base_url=cls.get_env_var("EMBEDDINGS_BASE_URL", required=False),
+                provider=values["EMBEDDINGS_PROVIDER"],
+                api_key=values["EMBEDDINGS_API_KEY"],
+                model=values["EMBEDDINGS_MODEL"],
+                base_url=values["EMBEDDINGS_BASE_URL"],
             )
             obj.embeddings = embeddings_config
 
-        llm_required_keys = ["LLM_PROVIDER", "LLM_API_KEY", "LLM_MODEL"]
-        llm_values = {key: cls.get_env_var(key, required=False) for key in llm_required_keys}
-        
-        if all(not value for value in llm_values.values()):
-            llm_config = None
-        else:
+        llm_config = None
+        if any(values[key] for key in _LLM_REQUIRED_ENV):
+            cls._raise_on_missing_env(values, _LLM_REQUIRED_ENV)
             llm_config = LlmConfig(
-                provider=llm_values["LLM_PROVIDER"],
-                api_key=llm_values["LLM_API_KEY"],
-                model=llm_values["LLM_MODEL"],
-                base_url=cls.get_env_var("LLM_BASE_URL", required=False),
-                temperature=float(cls.get_env_var("LLM_TEMPERATURE", required=False) or 0),
-                max_tokens=int(cls.get_env_var("LLM_MAX_TOKENS", required=False) or 12000),
+                provider=values["LLM_PROVIDER"],
+                api_key=values["LLM_API_KEY"],
+                model=values["LLM_MODEL"],
+                base_url=values["LLM_BASE_URL"],
+                temperature=float(values["LLM_TEMPERATURE"] or 0),
+                max_tokens=int(values["LLM_MAX_TOKENS"] or 12000),
             )
             obj.llm = llm_config
 
@@ -1,16 +1,28 @@
 import os
-import json
 from pathlib import Path
 
+# single reference to the process environment, avoids a getenv call per constant
+_env = os.environ
+
+def _env_or(key :str, default):
+    value = _env.get(key)
+    return value if value else default
+
 METADATA_JSON = Path(os.path.abspath(os.path.dirname(__file__))) / "models_metadata.json"
 
-DEFAULT_CONFIG_PATH = os.getenv("CONFIG_PATH") or "./config/config.yml"
+DEFAULT_CONFIG_PATH = _env_or("CONFIG_PATH", "./config/config.yml")
+
+DEFAULT_MCP_JSON_PATH = _env_or("MCP_JSON_PATH", "./config/mcp_config.json")
+
+DEFAULT_LOGS_DIR = _env_or("LOGS_PATH", "logs")
 
-DEFAULT_MCP_JSON_PATH = os.getenv("MCP_JSON_PATH") or "./config/mcp_config.json"
+# yaml configs larger than this are rejected before parsing
+MAX_CONFIG_BYTES = int(_env_or("AICORE_MAX_CONFIG_BYTES", 1024 * 1024))
 
-DEFAULT_LOGS_DIR = os.getenv("LOGS_PATH") or "logs"
+# skip full pydantic validation when loading trusted yaml configs
+SKIP_VALIDATION = _env.get("AICORE_SKIP_VALIDATION") == "1"
 
-CUSTOM_MODELS = [
+_DEFAULT_CUSTOM_MODELS = [
     "glm-4.5-flash"
     # "gemini-2.0-flash-exp",
     # "gemini-2.0-flash-thinking-exp-01-21",
@@ -36,19 +48,38 @@ OPENAI_RESPONSE_API_MODELS = [
     "o4-mini",
 ]
 
-try:
-    custom_models = json.loads(os.getenv("CUSTOM_MODELS", "[]"))
-    CUSTOM_MODELS.extend(custom_models)
-except json.JSONDecodeError:
-    print("\033[93m[WARNING] Passed CUSTOM_MODELS env var could not be parsed into JSON\033[0m")
-
-SUPPORTED_REASONER_PROVIDERS = ["groq", "openrouter", "nvidia"]
-
-SUPPORTED_REASONER_MODELS = [
+# roles accepted in message dicts passed as prompts, openai additionally accepts "developer"
+MESSAGE_ROLES = frozenset({"user", "system", "assistant", "tool"})
+
+def _load_custom_models()->list:
+    custom_models = list(_DEFAULT_CUSTOM_MODELS)
+    raw_custom_models = _env.get("CUSTOM_MODELS")
+    if raw_custom_models:
+        import orjson
+        try:
+            custom_models.extend(orjson.loads(raw_custom_models))
+        except orjson.JSONDecodeError:
+            print("\033[93m[WARNING] Passed CUSTOM_MODELS env var could not be parsed into JSON\033[0m")
+    return custom_models
+
+def __getattr__(name :str):
+    # CUSTOM_MODELS is only parsed from the environment on first access
+    if name == "CUSTOM_MODELS":
+        globals()["CUSTOM_MODELS"] = custom_models = _load_custom_models()
+        return custom_models
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+SUPPORTED_REASONER_PROVIDERS = frozenset({"groq", "openrouter", "nvidia"})
+
+SUPPORTED_REASONER_MODELS = frozenset({
     "deepseek-r1-distill-llama-70b", 
     "deepseek-ai/deepseek-r1",
     "deepseek/deepseek-r1:free"
-]
+})
+
+SUPPORTED_REASONER_PROVIDERS_MSG = f"Supported providers are {sorted(SUPPORTED_REASONER_PROVIDERS)}"
+
+SUPPORTED_REASONER_MODELS_MSG = f"Supported models are {sorted(SUPPORTED_REASONER_MODELS)}"
 
 GROQ_OPEN_AI_OSS_MODELS = [
     "openai/gpt-oss-120b",
@@ -67,25 +98,44 @@ STREAM_START_TOKEN = "<start>"
 
 STREAM_END_TOKEN = "</end>"
 
-SPECIAL_TOKENS = [
+SPECIAL_TOKENS = frozenset({
     REASONING_START_TOKEN,
     REASONING_STOP_TOKEN,
     TOOL_CALL_START_TOKEN,
     TOOL_CALL_END_TOKEN,
     STREAM_START_TOKEN,
     STREAM_END_TOKEN
-]
+})
 
 DEFAULT_ENCODING = "utf8"
 
+# Stream logging batch constants, chunks are coalesced into a single queue put
+# starting at DEFAULT_MIN_BATCH_SIZE and growing by DEFAULT_BATCH_SIZE_GROWTH_FACTOR
+# after each flush up to DEFAULT_BATCH_SIZE, a batch pending for DEFAULT_MAX_BATCH_DELAY
+# seconds is flushed with the next chunk regardless of its size
+DEFAULT_BATCH_SIZE = int(_env_or("DEFAULT_BATCH_SIZE", "0")) or 50
+DEFAULT_MIN_BATCH_SIZE = int(_env_or("DEFAULT_MIN_BATCH_SIZE", "0")) or 1
+DEFAULT_BATCH_SIZE_GROWTH_FACTOR = float(_env_or("DEFAULT_BATCH_SIZE_GROWTH_FACTOR", "0")) or 3
+DEFAULT_MAX_BATCH_DELAY = float(_env_or("DEFAULT_MAX_BATCH_DELAY", "0")) or 0.05
+
 # Tenacity constants
-DEFAULT_MAX_ATTEMPTS = int(os.getenv("MAX_ATTEMPTS", "0")) or 5
-DEFAULT_WAIT_MIN = int(os.getenv("WAIT_MIN", "0")) or 1
-DEFAULT_WAIT_MAX = int(os.getenv("WAIT_MAX", "0")) or 60
-DEFAULT_WAIT_EXP_MULTIPLIER = int(os.getenv("WAIT_EXP_MULTIPLIER", "0")) or 1
+DEFAULT_MAX_ATTEMPTS = int(_env_or("MAX_ATTEMPTS", "0")) or 5
+DEFAULT_WAIT_MIN = int(_env_or("WAIT_MIN", "0")) or 1
+DEFAULT_WAIT_MAX = int(_env_or("WAIT_MAX", "0")) or 60
+DEFAULT_WAIT_EXP_MULTIPLIER = int(_env_or("WAIT_EXP_MULTIPLIER", "0")) or 1
+
+DEFAULT_TIMEOUT = int(_env.get("AICORE_TIMEOUT", 20*60))
+
+# memoize remote token counting (i.e anthropic count_tokens) keyed by model and content digest
+TOKEN_COUNT_CACHE_ENABLED = _env.get("AICORE_TOKCOUNT_CACHE") != "0"
+TOKEN_COUNT_CACHE_SIZE = int(_env_or("AICORE_TOKCOUNT_CACHE_SIZE", "0")) or 1024
+
+# total size of the base64 encoded images kept in memory across providers, 0 disables the cache
+IMAGE_CACHE_MAX_BYTES = int(_env_or("AICORE_IMAGE_CACHE_BYTES", 32 * 1024 * 1024))
 
-DEFAULT_TIMEOUT = int(os.getenv("AICORE_TIMEOUT", 20*60))
+# maximum in-flight completions for Llm.acomplete_batch
+DEFAULT_MAX_CONCURRENCY = int(_env_or("MAX_CONCURRENCY", "0")) or 16
 
 # Observability constants
-DEFAULT_OBSERVABILITY_DIR = os.getenv("OBSERVABILITY_DIR") or "observability_data"
-DEFAULT_OBSERVABILITY_FILE = os.getenv("OBSERVABILITY_FILE") or "llm_operations.json"
\ No newline at end of file
+DEFAULT_OBSERVABILITY_DIR = _env_or("OBSERVABILITY_DIR", "observability_data")
+DEFAULT_OBSERVABILITY_FILE = _env_or("OBSERVABILITY_FILE", "llm_operations.json")
\ No newline at end of file
@@ -1,6 +1,13 @@
-from aicore.embeddings.embeddings import Embeddings
 from aicore.embeddings.config import EmbeddingsConfig
 
+def __getattr__(name :str):
+    # Embeddings imports every provider sdk, defer it until first accessed
+    if name == "Embeddings":
+        from aicore.embeddings.embeddings import Embeddings
+        globals()["Embeddings"] = Embeddings
+        return Embeddings
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 __all__ = [
     "EmbeddingsConfig",
     "Embeddings"
@@ -1,4 +1,4 @@
-from typing import Literal, Optional
+from typing import Any, Dict, Literal, Optional
 from pydantic import BaseModel
 from aicore.models_metadata import PricingConfig
 
@@ -7,4 +7,15 @@ class EmbeddingsConfig(BaseModel):
     api_key :str
     model :str
     base_url :Optional[str]=None    
-    pricing :Optional[PricingConfig]=None
\ No newline at end of file
+    pricing :Optional[PricingConfig]=None
+
+    @classmethod
+    def construct_trusted(cls, config :Dict[str, Any])->"EmbeddingsConfig":
+        """
+        Build an EmbeddingsConfig from an already well-formed dict (i.e parsed from a trusted yaml)
+        without running full pydantic validation. Nested pricing is still built as a PricingConfig.
+        """
+        config = dict(config)
+        if isinstance(config.get("pricing"), dict):
+            config["pricing"] = PricingConfig(**config["pricing"])
+        return cls.model_construct(**config)
@@ -1,25 +1,25 @@
 from pydantic import BaseModel, model_validator
-from typing import List
+from typing import Dict, List, Type
 from typing_extensions import Self
 from enum import Enum
+import importlib
+import sys
 
 from aicore.utils import retry_on_failure
 from aicore.embeddings.config import EmbeddingsConfig
-from aicore.embeddings.providers import (
-    EmbeddingsBaseProvider,
-    OpenAiEmbeddings,
-    MistralEmbeddings,
-    NvidiaEmbeddings,
-    GroqEmbeddings,
-    GeminiEmbeddings
-)
+from aicore.embeddings.providers.base_provider import EmbeddingsBaseProvider
 
 class Providers(Enum):
-    OPENAI :OpenAiEmbeddings=OpenAiEmbeddings
-    NVIDIA :NvidiaEmbeddings=NvidiaEmbeddings
-    MISTRAL :MistralEmbeddings=MistralEmbeddings
-    GROQ :GroqEmbeddings=GroqEmbeddings
-    GEMINI :GeminiEmbeddings=GeminiEmbeddings
+    OPENAI :str="aicore.embeddings.providers.openai:OpenAiEmbeddings"
+    NVIDIA :str="aicore.embeddings.providers.nvidia:NvidiaEmbeddings"
+    MISTRAL :str="aicore.embeddings.providers.mistral:MistralEmbeddings"
+    GROQ :str="aicore.embeddings.providers.groq:GroqEmbeddings"
+    GEMINI :str="aicore.embeddings.providers.gemini:GeminiEmbeddings"
+
+    @property
+    def provider_cls(self) -> Type[EmbeddingsBaseProvider]:
+        """Import and return the provider class, its sdk is only loaded on first use."""
+        return _load_provider(self.value)
 
     def get_instance(self, config: EmbeddingsConfig) -> EmbeddingsBaseProvider:
         """
@@ -31,7 +31,16 @@ class Providers(Enum):
         Returns:
             EmbeddingsBaseProvider: An instance of the embedding provider.
         """
-        return self.value.from_config(config)
+        return self.provider_cls.from_config(config)
+
+def _load_provider(import_path :str) -> Type[EmbeddingsBaseProvider]:
+    module, cls = import_path.split(":")
+    return getattr(importlib.import_module(module), cls)
+
+# flat lookup keyed on the interned lowercase EmbeddingsConfig.provider literal, skips the Enum indirection
+_PROVIDERS: Dict[str, str] = {
+    sys.intern(provider.name.lower()): provider.value for provider in Providers
+}
 
 class Embeddings(BaseModel):
     config :EmbeddingsConfig
@@ -51,7 +60,7 @@ class Embeddings(BaseModel):
     
     @model_validator(mode="after")
     def start_provider(self)->Self:
-        self.provider = Providers[self.config.provider.upper()].get_instance(self.config)
+        self.provider = _load_provider(_PROVIDERS[self.config.provider]).from_config(self.config)
         return self
     
     @classmethod
@@ -1,9 +1,33 @@
-from aicore.embeddings.providers.gemini import GeminiEmbeddings
-from aicore.embeddings.providers.groq import GroqEmbeddings
-from aicore.embeddings.providers.mistral import MistralEmbeddings
-from aicore.embeddings.providers.nvidia import NvidiaEmbeddings
-from aicore.embeddings.providers.openai import OpenAiEmbeddings
 from aicore.embeddings.providers.base_provider import EmbeddingsBaseProvider
+from typing import TYPE_CHECKING
+import importlib
+
+if TYPE_CHECKING:
+    from aicore.embeddings.providers.gemini import GeminiEmbeddings
+    from aicore.embeddings.providers.groq import GroqEmbeddings
+    from aicore.embeddings.providers.mistral import MistralEmbeddings
+    from aicore.embeddings.providers.nvidia import NvidiaEmbeddings
+    from aicore.embeddings.providers.openai import OpenAiEmbeddings
+
+# each provider module pulls its own sdk, only import the ones actually accessed
+_LAZY_IMPORTS = {
+    "GeminiEmbeddings": "aicore.embeddings.providers.gemini",
+    "GroqEmbeddings": "aicore.embeddings.providers.groq",
+    "MistralEmbeddings": "aicore.embeddings.providers.mistral",
+    "NvidiaEmbeddings": "aicore.embeddings.providers.nvidia",
+    "OpenAiEmbeddings": "aicore.embeddings.providers.openai"
+}
+
+def __getattr__(name :str):
+    module = _LAZY_IMPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
 
 __all__ = [
     "OpenAiEmbeddings",
@@ -12,4 +36,4 @@ __all__ = [
     "GroqEmbeddings",
     "GeminiEmbeddings",
     "EmbeddingsBaseProvider"
-]
\ No newline at end of file
+]
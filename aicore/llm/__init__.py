@@ -1,5 +1,12 @@
 from aicore.llm.config import LlmConfig
-from aicore.llm.llm import Llm
+
+def __getattr__(name :str):
+    # Llm imports every provider sdk, defer it until first accessed
+    if name == "Llm":
+        from aicore.llm.llm import Llm
+        globals()["Llm"] = Llm
+        return Llm
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 __all__ = [
     "LlmConfig",
@@ -2,8 +2,11 @@ from typing import List, Literal, Optional, Union, Dict, Any
 from typing_extensions import Self
 from pydantic import BaseModel, field_validator, model_validator, ConfigDict, Field
 
-from aicore.const import DEFAULT_TIMEOUT, SUPPORTED_REASONER_PROVIDERS, SUPPORTED_REASONER_MODELS
-from aicore.models_metadata import METADATA, PricingConfig
+from aicore.const import DEFAULT_TIMEOUT, SUPPORTED_REASONER_PROVIDERS, SUPPORTED_REASONER_MODELS, SUPPORTED_REASONER_PROVIDERS_MSG, SUPPORTED_REASONER_MODELS_MSG
+from aicore.models_metadata import METADATA_BY_PROVIDER_MODEL, ModelMetaData, PricingConfig
+
+def _metadata_for(provider :str, model :str)->Optional[ModelMetaData]:
+    return METADATA_BY_PROVIDER_MODEL.get((provider, model))
 
 class LlmConfig(BaseModel):
     provider :Literal["anthropic", "gemini", "groq", "mistral", "nvidia", "openai", "openrouter", "deepseek", "grok", "zai", "claude_code", "remote_claude_code"]
@@ -25,6 +28,8 @@ class LlmConfig(BaseModel):
 
     timeout :Optional[int]=DEFAULT_TIMEOUT
     tool_use :Optional[bool]=None
+    # in-process lru cache of non streamed, tool free responses at temperature 0, disabled when unset
+    response_cache_size :Optional[int]=None
     
     # claude_code-specific fields (ignored by other providers)
     permission_mode: Optional[str] = None
@@ -54,8 +59,8 @@ class LlmConfig(BaseModel):
     @classmethod
     def ensure_valid_reasoner(cls, reasoner :"LlmConfig")->"LlmConfig":
         if isinstance(reasoner, LlmConfig):
-            assert reasoner.provider in SUPPORTED_REASONER_PROVIDERS, f"{reasoner.provider} is not supported as a reasoner provider. Supported providers are {SUPPORTED_REASONER_PROVIDERS}"
-            assert reasoner.model in SUPPORTED_REASONER_MODELS, f"{reasoner.model} is not supported as a reasoner model. Supported models are {SUPPORTED_REASONER_MODELS}"
+            assert reasoner.provider in SUPPORTED_REASONER_PROVIDERS, f"{reasoner.provider} is not supported as a reasoner provider. {SUPPORTED_REASONER_PROVIDERS_MSG}"
+            assert reasoner.model in SUPPORTED_REASONER_MODELS, f"{reasoner.model} is not supported as a reasoner model. {SUPPORTED_REASONER_MODELS_MSG}"
         return reasoner
     
     @property
@@ -72,7 +77,7 @@ class LlmConfig(BaseModel):
 
     @model_validator(mode="after")
     def initialize_pricing_from_defaults(self)->Self:
-        model_metadata = METADATA.get(self.provider_model)
+        model_metadata = _metadata_for(self.provider, self.model)
         if model_metadata is not None:
             if self.pricing is None and model_metadata.pricing is not None:
                 if getattr(self, "use_anthropics_beta_expanded_ctx", None):
@@ -96,7 +101,23 @@ class LlmConfig(BaseModel):
             kwargs["tool_choice"] = "auto"
         return kwargs
     
+    @classmethod
+    def construct_trusted(cls, config :Dict[str, Any])->"LlmConfig":
+        """
+        Build an LlmConfig from an already well-formed dict (i.e parsed from a trusted yaml)
+        without running full pydantic validation. Only the fields with actual constraints
+        (temperature, reasoner) are checked and pricing defaults are still initialized.
+        """
+        config = dict(config)
+        if "temperature" in config:
+            config["temperature"] = cls.ensure_temperature_lower_than_unit(config["temperature"])
+        if isinstance(config.get("pricing"), dict):
+            config["pricing"] = PricingConfig(**config["pricing"])
+        if isinstance(config.get("reasoner"), dict):
+            config["reasoner"] = cls.ensure_valid_reasoner(cls.construct_trusted(config["reasoner"]))
+        return cls.model_construct(**config).initialize_pricing_from_defaults()
+
     def set_anthropics_beta_context(self):        
-        model_metadata = METADATA.get(self.provider_model)
+        model_metadata = _metadata_for(self.provider, self.model)
         self.use_anthropics_beta_expanded_ctx = True
         self.context_window = model_metadata.context_window
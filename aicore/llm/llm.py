@@ -1,59 +1,71 @@
 from pydantic import BaseModel, Field, RootModel, model_validator, computed_field
-from typing import Union, Optional, Callable, List, Dict
+from typing import Union, Optional, Callable, List, Dict, Type, AsyncGenerator
 from typing_extensions import Self
-from functools import partial
 from pathlib import Path
+from functools import lru_cache
 from enum import Enum
-from ulid import ulid
+import importlib
+import asyncio
+import sys
 
-from aicore.logger import _logger, Logger
+from aicore.logger import SessionLogger
 from aicore.utils import retry_on_failure, raise_on_balance_error
-from aicore.const import REASONING_STOP_TOKEN
+from aicore.const import REASONING_STOP_TOKEN, DEFAULT_MAX_CONCURRENCY
 from aicore.llm.usage import UsageInfo
 from aicore.llm.config import LlmConfig
 from aicore.llm.templates import REASONING_INJECTION_TEMPLATE, DEFAULT_SYSTEM_PROMPT, REASONER_DEFAULT_SYSTEM_PROMPT
 from aicore.llm.mcp.client import ToolExecutionCallback
-from aicore.llm.providers import (
-    LlmBaseProvider,
-    AnthropicLlm,
-    OpenAiLlm,
-    OpenRouterLlm,
-    MistralLlm,
-    NvidiaLlm,
-    GroqLlm,
-    GeminiLlm,
-    DeepSeekLlm,
-    ZaiLlm,
-    GrokLlm,
-    ClaudeCodeLlm,
-    RemoteClaudeCodeLlm,
-)
+from aicore.llm.utils import new_ulid
+from aicore.llm.providers.base_provider import LlmBaseProvider
 
 class Providers(Enum):
-    ANTHROPIC :AnthropicLlm=AnthropicLlm
-    OPENAI :OpenAiLlm=OpenAiLlm
-    OPENROUTER :OpenRouterLlm=OpenRouterLlm
-    MISTRAL :MistralLlm=MistralLlm
-    NVIDIA :NvidiaLlm=NvidiaLlm
-    GROQ :GroqLlm=GroqLlm
-    GROK :GrokLlm=GrokLlm
-    GEMINI :GeminiLlm=GeminiLlm
-    DEEPSEEK :DeepSeekLlm=DeepSeekLlm
-    ZAI :ZaiLlm=ZaiLlm
-    CLAUDE_CODE :ClaudeCodeLlm=ClaudeCodeLlm
-    REMOTE_CLAUDE_CODE :RemoteClaudeCodeLlm=RemoteClaudeCodeLlm
+    ANTHROPIC :str="aicore.llm.providers.anthropic:AnthropicLlm"
+    OPENAI :str="aicore.llm.providers.openai:OpenAiLlm"
+    OPENROUTER :str="aicore.llm.providers.openrouter:OpenRouterLlm"
+    MISTRAL :str="aicore.llm.providers.mistral:MistralLlm"
+    NVIDIA :str="aicore.llm.providers.nvidia:NvidiaLlm"
+    GROQ :str="aicore.llm.providers.groq:GroqLlm"
+    GROK :str="aicore.llm.providers.grok:GrokLlm"
+    GEMINI :str="aicore.llm.providers.gemini:GeminiLlm"
+    DEEPSEEK :str="aicore.llm.providers.deepseek:DeepSeekLlm"
+    ZAI :str="aicore.llm.providers.zai:ZaiLlm"
+    CLAUDE_CODE :str="aicore.llm.providers.claude_code:ClaudeCodeLlm"
+    REMOTE_CLAUDE_CODE :str="aicore.llm.providers.claude_code:RemoteClaudeCodeLlm"
+
+    @property
+    def provider_cls(self) -> Type[LlmBaseProvider]:
+        """Import and return the provider class, its sdk is only loaded on first use."""
+        return _load_provider(self.value)
 
     def get_instance(self, config: LlmConfig) -> LlmBaseProvider:
         """
         Instantiate the provider associated with the enum.
         
         Args:
-            config (EmbeddingsConfig): Configuration for the provider.
+            config (LlmConfig): Configuration for the provider.
         
         Returns:
-            LlmBaseProvider: An instance of the embedding provider.
+            LlmBaseProvider: An instance of the llm provider.
         """
-        return self.value.from_config(config)
+        return self.provider_cls.from_config(config)
+
+@lru_cache(maxsize=None)
+def _load_provider(import_path :str) -> Type[LlmBaseProvider]:
+    module, cls = import_path.split(":")
+    return getattr(importlib.import_module(module), cls)
+
+# REASONING_INJECTION_TEMPLATE split once around {reasoning} with the constant stop token already substituted
+_REASONING_INJECTION_HEAD, _reasoning_injection_rest = REASONING_INJECTION_TEMPLATE.split("{reasoning}", 1)
+_REASONING_INJECTION_TAIL = _reasoning_injection_rest.format(reasoning_stop_token=REASONING_STOP_TOKEN)
+del _reasoning_injection_rest
+
+# provider modules keeping http clients shared across instances, released by Llm.aclose_shared_clients
+_SHARED_CLIENT_MODULES = ("aicore.llm.providers.anthropic", "aicore.llm.providers.openai")
+
+# flat lookup keyed on the interned lowercase LlmConfig.provider literal, skips the Enum indirection
+_PROVIDERS: Dict[str, str] = {
+    sys.intern(provider.name.lower()): provider.value for provider in Providers
+}
 
 class Llm(BaseModel):
     """Main LLM class that provides synchronous and asynchronous completion interfaces.
@@ -94,7 +106,7 @@ class Llm(BaseModel):
     @computed_field
     def session_id(self)->str:
         """Get the current session ID from the provider."""
-        return self.provider.session_id
+        return self._provider.session_id
     
     @session_id.setter
     def session_id(self, value :str):
@@ -104,14 +116,14 @@ class Llm(BaseModel):
             value: The session ID to set
         """
         if value:
-            self.provider.session_id = value
-            if isinstance(self._logger_fn, Logger):
-                self._logger_fn = partial(_logger.log_chunk_to_queue, session_id=value)
+            self._provider.session_id = value
+            if isinstance(self._logger_fn, SessionLogger):
+                self._logger_fn.session_id = value
 
     @computed_field
     def extras(self)->dict:
         """Get provider extras dictionary."""
-        return self.provider.extras
+        return self._provider.extras
     
     @extras.setter
     def extras(self, value :dict):
@@ -121,12 +133,12 @@ class Llm(BaseModel):
             value: Dictionary of extra provider settings
         """
         if value and isinstance(value, dict):
-            self.provider.extras = value
+            self._provider.extras = value
 
     @computed_field
     def workspace(self)->Optional[str]:
         """Get the current workspace from the provider."""
-        return self.provider.worspace
+        return self._provider.worspace
     
     @workspace.setter
     def workspace(self, workspace):
@@ -135,22 +147,25 @@ class Llm(BaseModel):
         Args:
             workspace: Workspace identifier to set
         """
-        self.provider.workspace = workspace
+        self._provider.workspace = workspace
 
     @property
     def logger_fn(self)->Callable[[str], None]:
-        """Get or initialize the logger function.
+        """Get the custom logger function or a new SessionLogger for the current session.
         
         Returns:
-            A logging function bound to the current session
+            A logging function bound to the current session, SessionLoggers are created per access
+            so concurrent streams on this instance buffer their chunks in separate batches
         """
-        if self._logger_fn is None:
-            if self.session_id is None:
-                self.session_id = ulid()
-                if self.reasoner:
-                    self.reasoner.session_id = self.session_id
-            self._logger_fn = partial(_logger.log_chunk_to_queue, session_id=self.session_id)
-        return self._logger_fn
+        if self._logger_fn is not None:
+            return self._logger_fn
+        # read the provider directly, the session_id computed_field is kept for serialization only
+        provider = self._provider
+        if provider.session_id is None:
+            provider.session_id = new_ulid()
+            if self._reasoner:
+                self._reasoner.session_id = provider.session_id
+        return SessionLogger(provider.session_id)
 
     @logger_fn.setter
     def logger_fn(self, logger_fn:Callable[[str], None]):
@@ -168,7 +183,7 @@ class Llm(BaseModel):
     @tool_callback.setter
     def tool_callback(self, fn :Optional[ToolExecutionCallback]):
         self._tool_callback = fn
-        self.provider.tool_callback = self._tool_callback
+        self._provider.tool_callback = self._tool_callback
 
     @property
     def reasoner(self)->"Llm":
@@ -184,15 +199,35 @@ class Llm(BaseModel):
         """
         self._reasoner = reasoning_llm
         self._reasoner.system_prompt = REASONER_DEFAULT_SYSTEM_PROMPT
-        self._reasoner.provider.use_as_reasoner(self.session_id, self.workspace)
+        # share before use_as_reasoner wraps the completion fns with the stop token
+        self._reasoner._provider.share_http_client(self._provider)
+        self._reasoner._provider.use_as_reasoner(self._provider.session_id, self._provider.worspace)
     
     @model_validator(mode="after")
     def start_provider(self)->Self:
         """Initialize the provider after model validation."""
-        self.provider = Providers[self.config.provider.upper()].get_instance(self.config)
+        self._provider = _load_provider(_PROVIDERS[self.config.provider]).from_config(self.config)
         if self.config.reasoner:
             self.reasoner = Llm.from_config(self.config.reasoner)
         return self
+
+    async def aclose(self):
+        """Write the pending operation records and close the record writer and the pooled connections held by the provider and the reasoner.
+        Clients shared with other instances are left open, see aclose_shared_clients.
+        """
+        await self._provider.aclose_records()
+        await self._provider.aclose()
+        if self._reasoner is not None:
+            await self._reasoner.aclose()
+
+    @staticmethod
+    async def aclose_shared_clients():
+        """Close the http clients shared by every Llm on the running loop, call it on shutdown once no completion is in flight.
+        Modules that were never imported hold no clients and are not imported here.
+        """
+        for module_name in _SHARED_CLIENT_MODULES:
+            if (module := sys.modules.get(module_name)) is not None:
+                await module.aclose_all_clients()
     
     @classmethod
     def from_config(cls, config :LlmConfig)->"Llm":
@@ -209,12 +244,12 @@ class Llm(BaseModel):
     @property
     def tokenizer(self):
         """Get the tokenizer function from the provider."""
-        return self.provider.tokenizer_fn
+        return self._provider.tokenizer_fn
     
     @computed_field
     def usage(self)->UsageInfo:
         """Get usage information from the provider."""
-        return self.provider.usage
+        return self._provider.usage
     
     @staticmethod
     def _include_reasoning_as_prefix(prefix_prompt :Union[str, List[str], None], reasoning :str)->List[str]:
@@ -254,20 +289,22 @@ class Llm(BaseModel):
         Returns:
             List of prompts with reasoning included
         """
-        if self.reasoner:
-            system_prompt = system_prompt or self.reasoner.system_prompt
-            reasoning = self.reasoner.provider.complete(prompt, system_prompt, prefix_prompt, img_path, False, stream, agent_id, action_id)
-            reasoning_msg = REASONING_INJECTION_TEMPLATE.format(reasoning=reasoning, reasoning_stop_token=REASONING_STOP_TOKEN)
-            prefix_prompt = self._include_reasoning_as_prefix(prefix_prompt, reasoning_msg)
-            
-        return prefix_prompt
+        reasoner = self._reasoner
+        if reasoner is None:
+            return prefix_prompt
+
+        system_prompt = system_prompt or reasoner.system_prompt
+        reasoning = reasoner._provider.complete(prompt, system_prompt, prefix_prompt, img_path, False, stream, agent_id, action_id)
+        reasoning_msg = f"{_REASONING_INJECTION_HEAD}{reasoning}{_REASONING_INJECTION_TAIL}"
+        return self._include_reasoning_as_prefix(prefix_prompt, reasoning_msg)
     
     async def _areason(self, 
         prompt :Union[str, BaseModel, RootModel],
         system_prompt :Optional[Union[str, List[str]]]=None,
         prefix_prompt :Optional[Union[str, List[str]]]=None,
         img_path :Optional[Union[Union[str, Path], List[Union[str, Path]]]]=None,
-        stream :bool=True, agent_id: Optional[str]=None, action_id :Optional[str]=None)->List[str]:
+        stream :bool=True, agent_id: Optional[str]=None, action_id :Optional[str]=None,
+        stream_handler :Optional[Callable[[str], None]]=None)->List[str]:
         """Async version of _reason to generate reasoning steps.
         
         Args:
@@ -278,16 +315,19 @@ class Llm(BaseModel):
             stream: Whether to stream the response
             agent_id: Optional agent identifier
             action_id: Optional action identifier
+            stream_handler: Optional handler for the reasoning chunks, defaults to logger_fn
             
         Returns:
             List of prompts with reasoning included
         """
-        if self.reasoner:
-            sys_prompt = system_prompt or self.reasoner.system_prompt
-            reasoning = await self.reasoner.provider.acomplete(prompt, sys_prompt, prefix_prompt, img_path, False, stream, self.logger_fn, agent_id, action_id)
-            reasoning_msg = REASONING_INJECTION_TEMPLATE.format(reasoning=reasoning, reasoning_stop_token=REASONING_STOP_TOKEN)
-            prefix_prompt = self._include_reasoning_as_prefix(prefix_prompt, reasoning_msg)            
-        return prefix_prompt
+        reasoner = self._reasoner
+        if reasoner is None:
+            return prefix_prompt
+
+        sys_prompt = system_prompt or reasoner.system_prompt
+        reasoning = await reasoner._provider.acomplete(prompt, sys_prompt, prefix_prompt, img_path, False, stream, stream_handler or self.logger_fn, agent_id, action_id)
+        reasoning_msg = f"{_REASONING_INJECTION_HEAD}{reasoning}{_REASONING_INJECTION_TAIL}"
+        return self._include_reasoning_as_prefix(prefix_prompt, reasoning_msg)
     
     @retry_on_failure
     @raise_on_balance_error
@@ -323,7 +363,7 @@ class Llm(BaseModel):
 
         sys_prompt = system_prompt or self.system_prompt
         prefix_prompt = self._reason(prompt, None, prefix_prompt, img_path, stream, agent_id, action_id)
-        return self.provider.complete(prompt, sys_prompt, prefix_prompt, img_path, json_output, stream, agent_id, action_id)
+        return self._provider.complete(prompt, sys_prompt, prefix_prompt, img_path, json_output, stream, agent_id, action_id)
     
     # @retry_on_failure
     @raise_on_balance_error
@@ -336,7 +376,8 @@ class Llm(BaseModel):
                  stream :bool=True,
                  as_message_records :bool=False,
                  agent_id :Optional[str]=None,
-                 action_id :Optional[str]=None) -> Union[str, Dict, List[Union[str, Dict[str, str]]]]:
+                 action_id :Optional[str]=None,
+                 yield_chunks :bool=False) -> Union[str, Dict, List[Union[str, Dict[str, str]]], AsyncGenerator[str, None]]:
         """Async version of complete() to generate completions.
         
         Args:
@@ -348,16 +389,144 @@ class Llm(BaseModel):
             stream: Whether to stream the response
             agent_id: Optional agent identifier
             action_id: Optional ac*tion identifier
+            yield_chunks: Return an async generator over the streamed chunks instead of the final result
             
         Returns:
-            The completion result as either a string or dictionary (if json_output=True)
+            The completion result as either a string or dictionary (if json_output=True),
+            or an async generator of chunks if yield_chunks=True
 
         Example:
             >>> llm = Llm(config=LlmConfig(provider="openai", api_key="...", model="gpt-4"))
             >>> response = await llm.acomplete("Hello world")
             >>> print(response)
+            >>> async for chunk in await llm.acomplete("Hello world", yield_chunks=True):
+            ...     print(chunk, end="")
         """
          
         sys_prompt = system_prompt or self.system_prompt
-        prefix_prompt = await self._areason(prompt, None, prefix_prompt, img_path, stream, agent_id, action_id)
-        return await self.provider.acomplete(prompt, sys_prompt, prefix_prompt, img_path, json_output, stream, as_message_records, self.logger_fn, agent_id, action_id)
\ No newline at end of file
+        if yield_chunks:
+            return self._acomplete_chunks(prompt, sys_prompt, prefix_prompt, img_path, json_output, as_message_records, agent_id, action_id)
+
+        # one logger per call, the reasoner and provider streams run one after the other
+        logger_fn = self.logger_fn
+        try:
+            if self._reasoner is None:
+                prefix_prompt = await self._areason(prompt, None, prefix_prompt, img_path, stream, agent_id, action_id, stream_handler=logger_fn)
+            else:
+                # warm up the main provider's mcp connection while the reasoner is thinking,
+                # connect_to_mcp is a no-op once connected so the provider call below reuses it
+                prefix_prompt, _ = await asyncio.gather(
+                    self._areason(prompt, None, prefix_prompt, img_path, stream, agent_id, action_id, stream_handler=logger_fn),
+                    self._provider.connect_to_mcp()
+                )
+            return await self._provider.acomplete(prompt, sys_prompt, prefix_prompt, img_path, json_output, stream, as_message_records, logger_fn, agent_id, action_id)
+        finally:
+            if logger_fn is not self._logger_fn:
+                await logger_fn.aclose()
+
+    async def _acomplete_chunks(self,
+                 prompt :Union[str, List[str], List[Dict[str, str]], BaseModel, RootModel],
+                 system_prompt :Optional[Union[str, List[str]]]=None,
+                 prefix_prompt :Optional[Union[str, List[str]]]=None,
+                 img_path :Optional[Union[Union[str, Path, bytes], List[Union[str, Path, bytes]]]]=None,
+                 json_output :bool=False,
+                 as_message_records :bool=False,
+                 agent_id :Optional[str]=None,
+                 action_id :Optional[str]=None) -> AsyncGenerator[str, None]:
+        """Yield the reasoner and provider stream chunks (special tokens included) as they are generated.
+        Chunks are handed to the caller instead of logger_fn, provider errors are raised once the stream is drained.
+        """
+        queue :asyncio.Queue = asyncio.Queue()
+
+        async def _run():
+            _prefix_prompt = await self._areason(prompt, None, prefix_prompt, img_path, True, agent_id, action_id, stream_handler=queue.put)
+            return await self._provider.acomplete(prompt, system_prompt, _prefix_prompt, img_path, json_output, True, as_message_records, queue.put, agent_id, action_id)
+
+        task = asyncio.ensure_future(_run())
+        task.add_done_callback(lambda _: queue.put_nowait(None))
+        try:
+            while (chunk := await queue.get()) is not None:
+                yield chunk
+            task.result()
+        finally:
+            task.cancel()
+
+    async def acomplete_batch(self,
+                 prompts :List[Union[str, List[str], List[Dict[str, str]], BaseModel, RootModel]],
+                 max_concurrency :int=DEFAULT_MAX_CONCURRENCY,
+                 return_exceptions :bool=False,
+                 **kwargs) -> List[Union[str, Dict, List[Union[str, Dict[str, str]]], BaseException]]:
+        """Run acomplete() concurrently over multiple prompts.
+
+        Every item shares this instance's provider, so items always run with stream=False and
+        the provider must not have tools or an mcp_config: streamed usage and the successive
+        tool call counter are provider state that concurrent items would overwrite.
+        
+        Args:
+            prompts: Input prompts, each accepted by acomplete()
+            max_concurrency: Maximum number of in-flight completions
+            return_exceptions: Return failed completions' exceptions in place instead of raising the first one
+            **kwargs: Additional arguments forwarded to every acomplete() call
+            
+        Returns:
+            List of completion results (or exceptions) in the same order as prompts
+
+        Raises:
+            ValueError: If stream=True is requested or the provider has tools configured
+
+        Example:
+            >>> llm = Llm(config=LlmConfig(provider="openai", api_key="...", model="gpt-4"))
+            >>> responses = await llm.acomplete_batch(["Hello", "World"])
+        """
+        if kwargs.get("stream") or kwargs.get("yield_chunks"):
+            raise ValueError("acomplete_batch only supports stream=False, stream the prompts with acomplete() instead")
+        if self._provider.tools or self.config.mcp_config:
+            raise ValueError("acomplete_batch does not support tool calls, run tool using prompts with acomplete() instead")
+        kwargs["stream"] = False
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def _acomplete(prompt):
+            async with semaphore:
+                return await self.acomplete(prompt, **kwargs)
+
+        return await asyncio.gather(*[_acomplete(prompt) for prompt in prompts], return_exceptions=return_exceptions)
+
+    def complete_batch(self,
+                 prompts :List[Union[str, BaseModel, RootModel]],
+                 max_concurrency :int=DEFAULT_MAX_CONCURRENCY,
+                 return_exceptions :bool=False,
+                 **kwargs) -> List[Union[str, Dict, BaseException]]:
+        """Sync wrapper around acomplete_batch(), must not be called from a running event loop.
+        
+        Args:
+            prompts: Input prompts, each accepted by acomplete()
+            max_concurrency: Maximum number of in-flight completions
+            return_exceptions: Return failed completions' exceptions in place instead of raising the first one
+            **kwargs: Additional arguments forwarded to every acomplete() call
+            
+        Returns:
+            List of completion results (or exceptions) in the same order as prompts
+        """
+        return asyncio.run(self.acomplete_batch(prompts, max_concurrency=max_concurrency, return_exceptions=return_exceptions, **kwargs))
+
+    async def batch_complete_offline(self,
+                 prompts :List[Union[str, List[str], List[Dict[str, str]]]],
+                 system_prompt :Optional[Union[str, List[str]]]=None,
+                 json_output :bool=False,
+                 poll_interval :float=30) -> List[Optional[Union[str, Dict]]]:
+        """Run prompts through the provider's offline batch api, cheaper than realtime calls but with delayed results.
+        
+        Args:
+            prompts: Input prompts, each accepted by complete()
+            system_prompt: Optional system prompt override
+            json_output: Whether to parse outputs as JSON
+            poll_interval: Seconds between batch status checks
+            
+        Returns:
+            Outputs in the same order as prompts, None for requests that failed inside the batch
+
+        Raises:
+            NotImplementedError: If the provider has no batch api
+        """
+        sys_prompt = system_prompt or self.system_prompt
+        return await self._provider.batch_complete_offline(prompts, sys_prompt, json_output, poll_interval)
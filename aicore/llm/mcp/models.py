@@ -48,6 +48,19 @@ class InputSchema(BaseModel):
         extra="allow",
     )
 
+    def to_parameters(self)->Dict[str, Any]:
+        """
+        Json schema parameters as sent to providers, type/properties/required first followed by any extras.
+        Built from a single model_dump traversal.
+        """
+        parameters = self.model_dump()
+        return {
+            "type": parameters.pop("type"),
+            "properties": parameters.pop("properties"),
+            "required": parameters.pop("required"),
+            **parameters
+        }
+
 class ToolSchema(BaseModel):
     name :str
     description :str
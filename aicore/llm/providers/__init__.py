@@ -86,18 +86,50 @@ See also
 - ``config/config_example_remote_claude_code.yml``  — remote provider config
 """
 
-from aicore.llm.providers.gemini import GeminiLlm
-from aicore.llm.providers.groq import GroqLlm
-from aicore.llm.providers.mistral import MistralLlm
-from aicore.llm.providers.nvidia import NvidiaLlm
-from aicore.llm.providers.anthropic import AnthropicLlm
-from aicore.llm.providers.openai import OpenAiLlm
-from aicore.llm.providers.openrouter import OpenRouterLlm
-from aicore.llm.providers.grok import GrokLlm
-from aicore.llm.providers.deepseek import DeepSeekLlm
-from aicore.llm.providers.zai import ZaiLlm
-from aicore.llm.providers.claude_code import ClaudeCodeLlm, RemoteClaudeCodeLlm
 from aicore.llm.providers.base_provider import LlmBaseProvider
+from typing import TYPE_CHECKING
+import importlib
+import os
+
+if TYPE_CHECKING:
+    from aicore.llm.providers.gemini import GeminiLlm
+    from aicore.llm.providers.groq import GroqLlm
+    from aicore.llm.providers.mistral import MistralLlm
+    from aicore.llm.providers.nvidia import NvidiaLlm
+    from aicore.llm.providers.anthropic import AnthropicLlm
+    from aicore.llm.providers.openai import OpenAiLlm
+    from aicore.llm.providers.openrouter import OpenRouterLlm
+    from aicore.llm.providers.grok import GrokLlm
+    from aicore.llm.providers.deepseek import DeepSeekLlm
+    from aicore.llm.providers.zai import ZaiLlm
+    from aicore.llm.providers.claude_code import ClaudeCodeLlm, RemoteClaudeCodeLlm
+
+# each provider module pulls its own sdk, only import the ones actually accessed
+_LAZY_IMPORTS = {
+    "GeminiLlm": "aicore.llm.providers.gemini",
+    "GroqLlm": "aicore.llm.providers.groq",
+    "MistralLlm": "aicore.llm.providers.mistral",
+    "NvidiaLlm": "aicore.llm.providers.nvidia",
+    "AnthropicLlm": "aicore.llm.providers.anthropic",
+    "OpenAiLlm": "aicore.llm.providers.openai",
+    "OpenRouterLlm": "aicore.llm.providers.openrouter",
+    "GrokLlm": "aicore.llm.providers.grok",
+    "DeepSeekLlm": "aicore.llm.providers.deepseek",
+    "ZaiLlm": "aicore.llm.providers.zai",
+    "ClaudeCodeLlm": "aicore.llm.providers.claude_code",
+    "RemoteClaudeCodeLlm": "aicore.llm.providers.claude_code"
+}
+
+def __getattr__(name :str):
+    module = _LAZY_IMPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
 
 __all__ = [
     "AnthropicLlm",
@@ -113,4 +145,9 @@ __all__ = [
     "ClaudeCodeLlm",
     "RemoteClaudeCodeLlm",
     "LlmBaseProvider"
-]
\ No newline at end of file
+]
+
+# AICORE_EAGER_IMPORT=1 resolves every provider at import, i.e to surface broken sdk installs in CI
+if os.environ.get("AICORE_EAGER_IMPORT") == "1":
+    for _name in _LAZY_IMPORTS:
+        __getattr__(_name)
@@ -1,26 +1,119 @@
 from aicore.llm.providers.anthropic.consts import BETA_1M_CONTEXT_HEADERS, CC_DEFAULT_HEADERS, CC_DEFAULT_QUERY, CC_SYSTEM_PROMPT
 from aicore.llm.providers.base_provider import LlmBaseProvider
 from aicore.llm.utils import detect_image_type, is_base64
-from aicore.models import AuthenticationError
+from aicore.const import TOKEN_COUNT_CACHE_ENABLED, TOKEN_COUNT_CACHE_SIZE
 from aicore.logger import default_stream_handler
 from pydantic import model_validator
-from typing import Any, Optional, Dict, Union, List
+from typing import Any, Optional, Dict, Tuple, Union, List, TYPE_CHECKING
 from typing_extensions import Self
-from anthropic import Anthropic, AsyncAnthropic
-from anthropic.types import RawContentBlockStartEvent, ToolUseBlock, RawContentBlockDeltaEvent, InputJSONDelta, Message
 from functools import partial
+from operator import attrgetter
+import threading
+import weakref
+import asyncio
+import hashlib
 
 from aicore.llm.mcp.models import ToolCallSchema, ToolCalls, ToolSchema
 
+if TYPE_CHECKING:
+    # the sdk is only imported once an AnthropicLlm is built, events are matched on their type strings
+    from anthropic import Anthropic, AsyncAnthropic
+    from anthropic.types import Message
+
+# (model, blake2b digest of the contents) -> input tokens, least recently used entries evicted first
+_TOKEN_COUNT_CACHE: Dict[tuple, int] = {}
+# providers count tokens from several threads (i.e the telemetry worker), the network call is made outside of it
+_TOKEN_COUNT_CACHE_LOCK = threading.Lock()
+
+# content_block_delta payload by delta type, other deltas (i.e input_json_delta) are not streamed as text
+_DELTA_EXTRACTORS = {
+    "text_delta": attrgetter("text"),
+    "thinking_delta": attrgetter("thinking"),
+    "signature_delta": attrgetter("signature")
+}
+
+# (event type, content_block / delta type) -> tool call payload carried by the event
+_TOOL_CHUNK_EXTRACTORS = {
+    ("content_block_start", "tool_use"): attrgetter("content_block"),
+    ("content_block_delta", "input_json_delta"): attrgetter("delta")
+}
+
+# clients are shared by every AnthropicLlm with the same credentials so they reuse one connection pool,
+# async clients are additionally scoped to the running event loop their httpx pool binds to
+_CLIENTS: "Dict[tuple, Anthropic]" = {}
+_ACLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[tuple, AsyncAnthropic]]" = weakref.WeakKeyDictionary()
+_CLIENTS_LOCK = threading.Lock()
+
+def _get_client(api_key :Optional[str], auth_token :Optional[str], timeout :Optional[int])->"Anthropic":
+    from anthropic import Anthropic
+
+    key = (api_key, auth_token, timeout)
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(key)
+        if client is None:
+            client = _CLIENTS[key] = Anthropic(api_key=api_key, auth_token=auth_token, timeout=timeout)
+    return client
+
+def _get_aclient(api_key :Optional[str], auth_token :Optional[str], timeout :Optional[int])->"Tuple[AsyncAnthropic, bool]":
+    """Return the async client and whether it is shared, dedicated clients are closed by their provider"""
+    from anthropic import AsyncAnthropic
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # no loop to scope the pool to yet, keep a dedicated client
+        return AsyncAnthropic(api_key=api_key, auth_token=auth_token, timeout=timeout), False
+
+    key = (api_key, auth_token, timeout)
+    with _CLIENTS_LOCK:
+        loop_clients = _ACLIENTS.setdefault(loop, {})
+        aclient = loop_clients.get(key)
+        if aclient is None:
+            aclient = loop_clients[key] = AsyncAnthropic(api_key=api_key, auth_token=auth_token, timeout=timeout)
+    return aclient, True
+
+def close_all_clients():
+    """Close the shared sync clients and drop every cached client, i.e on interpreter teardown"""
+    with _CLIENTS_LOCK:
+        for client in _CLIENTS.values():
+            client.close()
+        _CLIENTS.clear()
+        _ACLIENTS.clear()
+
+async def aclose_all_clients():
+    """Close the shared sync clients and the async clients bound to the running loop, i.e on application shutdown"""
+    loop = asyncio.get_running_loop()
+    with _CLIENTS_LOCK:
+        clients = list(_CLIENTS.values())
+        _CLIENTS.clear()
+        aclients = list(_ACLIENTS.pop(loop, {}).values())
+    for client in clients:
+        client.close()
+    for aclient in aclients:
+        await aclient.close()
+
 class AnthropicLlm(LlmBaseProvider):
     _access_token :Optional[str] = None
+    _system_blocks_cache :Optional[tuple] = None
+    _owns_aclient :bool = False
     
     @staticmethod
-    def anthropic_count_tokens(contents :str, client :AsyncAnthropic, model :str):
+    def anthropic_count_tokens(contents :str, client :"Anthropic", model :str):
         """
         unfortunately system messages can not be included into the count's default method
         due to the way the tokennizer fn has been implemented in aicore
         """
+        cache_key = None
+        if TOKEN_COUNT_CACHE_ENABLED:
+            cache_key = (model, hashlib.blake2b(contents.encode(), digest_size=16).digest())
+            with _TOKEN_COUNT_CACHE_LOCK:
+                input_tokens = _TOKEN_COUNT_CACHE.pop(cache_key, None)
+                if input_tokens is not None:
+                    # reinsert as most recently used
+                    _TOKEN_COUNT_CACHE[cache_key] = input_tokens
+            if input_tokens is not None:
+                return range(input_tokens)
+
         response = client.messages.count_tokens(
             model=model,
             messages=[{
@@ -28,30 +121,40 @@ class AnthropicLlm(LlmBaseProvider):
                 "content": contents
             }],
         )
-        input_tokens = response.model_dump().get("input_tokens")
-        return [i for i in range(input_tokens)] if input_tokens else []
+        input_tokens = response.input_tokens or 0
+
+        if cache_key is not None:
+            with _TOKEN_COUNT_CACHE_LOCK:
+                if cache_key not in _TOKEN_COUNT_CACHE and len(_TOKEN_COUNT_CACHE) >= TOKEN_COUNT_CACHE_SIZE:
+                    del _TOKEN_COUNT_CACHE[next(iter(_TOKEN_COUNT_CACHE))]
+                _TOKEN_COUNT_CACHE[cache_key] = input_tokens
+        # only the length is ever used, a range avoids materializing one int per token
+        return range(input_tokens)
 
     @model_validator(mode="after")
     def set_anthropic(self)->Self:
+        from anthropic import AuthenticationError as AnthropicAuthError
+
         self.set_access_token()
         self.set_beta_context_window()
 
-        _client :Anthropic = Anthropic(            
-            auth_token=self._access_token,
+        _client = _get_client(
             api_key=self.config.api_key,
+            auth_token=self._access_token,
             timeout=self.config.timeout
         )
-        self.client :Anthropic = _client
-        self._auth_exception = AuthenticationError
+        self.client = _client
+        self._auth_exception = AnthropicAuthError
         if self._access_token is None:
             self.validate_config()
 
-        _aclient :AsyncAnthropic = AsyncAnthropic(
+        _aclient, shared = _get_aclient(
             api_key=self.config.api_key,
             auth_token=self._access_token,
             timeout=self.config.timeout
         )
         self._aclient = _aclient
+        self._owns_aclient = not shared
         self.completion_fn = _client.messages.create
         self.acompletion_fn = _aclient.messages.create
         self.normalize_fn = self.normalize
@@ -66,6 +169,12 @@ class AnthropicLlm(LlmBaseProvider):
 
         return self
     
+    async def aclose(self):
+        """Close a dedicated async client, shared clients are released through aclose_all_clients instead."""
+        if self._owns_aclient:
+            self._owns_aclient = False
+            await self._aclient.close()
+
     def set_access_token(self):
         if self._access_token is None and hasattr(self.config, "access_token"):
             self._access_token = self.config.access_token
@@ -105,58 +214,55 @@ class AnthropicLlm(LlmBaseProvider):
             elif event_type == "message_delta":
                 usage.output_tokens = event.usage.output_tokens  # update final output_tokens
         """
-        event_type = event.type
-        input_tokens = 0
-        output_tokens = 0
-        if event_type == "message_start":
-            input_tokens = event.message.usage.input_tokens
-            output_tokens = event.message.usage.output_tokens
-            cache_write_tokens = event.message.usage.cache_creation_input_tokens
-            cached_tokens = event.message.usage.cache_read_input_tokens
-            ### https://docs.anthropic.com/en/docs/build-with-claude/prompt-caching
-            self.usage.record_completion(
-                prompt_tokens=input_tokens,
-                response_tokens=output_tokens,
-                cached_tokens=cached_tokens,
-                cache_write_tokens=cache_write_tokens,
-                completion_id=completion_id or event.message.id
-            )
-        elif event_type == "content_block_delta":
-            return event
-        elif event_type == "content_block":
-            return event
-        elif event_type == "message":
-            input_tokens = event.usage.input_tokens
-            output_tokens = event.usage.output_tokens
-            cache_write_tokens = event.usage.cache_creation_input_tokens
-            cached_tokens = event.usage.cache_read_input_tokens
-            ### https://docs.anthropic.com/en/docs/build-with-claude/prompt-caching
-            self.usage.record_completion(
-                prompt_tokens=input_tokens,
-                response_tokens=output_tokens,
-                cached_tokens=cached_tokens,
-                cache_write_tokens=cache_write_tokens,
-                completion_id=completion_id or event.id
-            )
-            return event
-        elif event_type == "content_block_start" and isinstance(getattr(event, "content_block", None), ToolUseBlock):
+        handler = _NORMALIZE_HANDLERS.get(event.type)
+        return handler(self, event, completion_id) if handler is not None else None
+
+    def _normalize_message_start(self, event, completion_id :Optional[str]=None):
+        message = event.message
+        usage = message.usage
+        ### https://docs.anthropic.com/en/docs/build-with-claude/prompt-caching
+        self.usage.record_completion(
+            prompt_tokens=usage.input_tokens,
+            response_tokens=usage.output_tokens,
+            cached_tokens=usage.cache_read_input_tokens,
+            cache_write_tokens=usage.cache_creation_input_tokens,
+            completion_id=completion_id or message.id
+        )
+
+    def _normalize_message(self, event, completion_id :Optional[str]=None):
+        usage = event.usage
+        ### https://docs.anthropic.com/en/docs/build-with-claude/prompt-caching
+        self.usage.record_completion(
+            prompt_tokens=usage.input_tokens,
+            response_tokens=usage.output_tokens,
+            cached_tokens=usage.cache_read_input_tokens,
+            cache_write_tokens=usage.cache_creation_input_tokens,
+            completion_id=completion_id or event.id
+        )
+        return event
+
+    def _normalize_message_delta(self, event, completion_id :Optional[str]=None):
+        self.usage.record_completion(
+            prompt_tokens=0,
+            response_tokens=event.usage.output_tokens,
+            completion_id=completion_id
+        )
+
+    def _normalize_content_block_start(self, event, completion_id :Optional[str]=None):
+        # only tool_use blocks are forwarded, text blocks start empty and arrive through their deltas
+        if getattr(event.content_block, "type", None) == "tool_use":
             return event
-        elif event_type == "message_delta":
-            output_tokens = event.usage.output_tokens
-            self.usage.record_completion(
-                prompt_tokens=0,
-                response_tokens=output_tokens,
-                completion_id=completion_id
-            )
-
-    def _chunk_from_provider(self, _chunk :RawContentBlockStartEvent):
+
+    def _normalize_passthrough(self, event, completion_id :Optional[str]=None):
+        return event
+
+    def _chunk_from_provider(self, _chunk):
         return _chunk
     
     def _tool_chunk_from_provider(self, _chunk):
-        if isinstance(_chunk, RawContentBlockStartEvent) and isinstance(_chunk.content_block, ToolUseBlock):
-            return _chunk.content_block
-        elif isinstance(_chunk, RawContentBlockDeltaEvent) and isinstance(_chunk.delta, InputJSONDelta):
-            return _chunk.delta
+        payload = getattr(_chunk, "content_block", None) or getattr(_chunk, "delta", None)
+        extractor = _TOOL_CHUNK_EXTRACTORS.get((getattr(_chunk, "type", None), getattr(payload, "type", None)))
+        return extractor(_chunk) if extractor is not None else None
 
     def _fill_tool_schema(self, tool_chunk)->ToolCallSchema:
         tool_call = ToolCallSchema(
@@ -168,18 +274,18 @@ class AnthropicLlm(LlmBaseProvider):
         return tool_call
     
     def _tool_call_change_condition(self, tool_chunk)->bool:
-        return isinstance(tool_chunk, ToolUseBlock)
+        return getattr(tool_chunk, "type", None) == "tool_use"
 
     def _handle_tool_call_stream(self, tool_call :ToolCallSchema, tool_chunk)->ToolCallSchema:
         tool_call.arguments += tool_chunk.partial_json
         return tool_call
     
-    def _no_stream(self, response: Message) -> Union[str, ToolCalls]:
+    def _no_stream(self, response: "Message") -> Union[str, ToolCalls]:
         """Process a non-streaming response, handling tool calls appropriately."""
         response = self.normalize_fn(response)
         # Extract and process content blocks
         messages = [
-            self._fill_tool_schema(block) if isinstance(block, ToolUseBlock) else block.text
+            self._fill_tool_schema(block) if block.type == "tool_use" else block.text
             for block in response.content
         ]
         
@@ -208,38 +314,30 @@ class AnthropicLlm(LlmBaseProvider):
         return result
 
     def _is_tool_call(self, _chunk)->bool:
-        if isinstance(_chunk, RawContentBlockStartEvent) and isinstance(_chunk.content_block, ToolUseBlock):
-            return True
-        elif isinstance(_chunk, RawContentBlockDeltaEvent) and isinstance(_chunk.delta, InputJSONDelta):
-            return True        
-        # hasattr(cls._chunk_from_provider(_chunk).delta, "tool_calls") and cls._chunk_from_provider(_chunk).delta.tool_calls:
-            # return True
-        return False
+        return self._tool_chunk_from_provider(_chunk) is not None
 
     def _handle_stream_messages(self, event, message, _skip=False)->bool:
-        if hasattr(event, "delta"):
-            delta = event.delta
-            chunk_message = getattr(delta, "text", "")
-            chunk_thinking = getattr(delta, "thinking", None)
-            chunk_signature = getattr(delta, "signature", None)
-            chunk_stream = chunk_message or chunk_thinking or chunk_signature
-            default_stream_handler(chunk_stream)
+        delta = getattr(event, "delta", None)
+        delta_type = getattr(delta, "type", None)
+        extractor = _DELTA_EXTRACTORS.get(delta_type)
+        if extractor is not None:
+            chunk_stream = extractor(delta)
             if chunk_stream:
-                if chunk_message:
-                    message.append(chunk_message)
+                default_stream_handler(chunk_stream)
+                if delta_type == "text_delta":
+                    message.append(chunk_stream)
         return False
 
     async def _handle_astream_messages(self, event, logger_fn, message, _skip=False)->bool:
-        if hasattr(event, "delta"):
-            delta = event.delta
-            chunk_message = getattr(delta, "text", "")
-            chunk_thinking = getattr(delta, "thinking", None)
-            chunk_signature = getattr(delta, "signature", None)
-            chunk_stream = chunk_message or chunk_thinking or chunk_signature
+        delta = getattr(event, "delta", None)
+        delta_type = getattr(delta, "type", None)
+        extractor = _DELTA_EXTRACTORS.get(delta_type)
+        if extractor is not None:
+            chunk_stream = extractor(delta)
             if chunk_stream:
                 await logger_fn(chunk_stream)
-                if chunk_message:
-                    message.append(chunk_message)
+                if delta_type == "text_delta":
+                    message.append(chunk_stream)
         return False
 
     def _handle_system_prompt(self,
@@ -248,26 +346,45 @@ class AnthropicLlm(LlmBaseProvider):
         pass
 
     def _handle_special_sys_prompt_anthropic(self, args :Dict, system_prompt: Optional[Union[List[str], str]] = None):
+        # system prompts rarely change within a session, reuse the blocks built for the previous call
+        cache_control = getattr(self.config, "cache_control", None)
+        cache_key = (
+            tuple(system_prompt) if isinstance(system_prompt, list) else system_prompt,
+            tuple(cache_control) if isinstance(cache_control, list) else cache_control
+        )
+        cached = self._system_blocks_cache
+        if cached is not None and cached[0] == cache_key:
+            processed_system_prompts = cached[1]
+        else:
+            processed_system_prompts = self._build_system_blocks(system_prompt)
+            self._system_blocks_cache = (cache_key, processed_system_prompts)
+
+        if processed_system_prompts is not None:
+            args["system"] = processed_system_prompts
+
+    def _build_system_blocks(self, system_prompt: Optional[Union[List[str], str]] = None)->Optional[List[Dict]]:
         if self._access_token is not None:
             if isinstance(system_prompt, str):
                 system_prompt = [system_prompt]
-            system_prompt.insert(0, CC_SYSTEM_PROMPT)
+            # copy instead of insert, the caller's list is reused across calls
+            system_prompt = [CC_SYSTEM_PROMPT, *system_prompt]
         
         if system_prompt:
             if getattr(self.config, "cache_control", None):
                 cached_system_prompts_index :list = getattr(self.config, "cache_control")
                 assert isinstance(cached_system_prompts_index, list), "cache_control param must be a list of ints"
                 system_prompt = [system_prompt] if isinstance(system_prompt, str) else system_prompt
-                processed_system_prompts = []
-                for i, prompt in enumerate(system_prompt):
-                    prompt =  {
+                cached_system_prompts_index = set(cached_system_prompts_index)
+                return [
+                    {
                         "type": "text",
                         "text": prompt,
-                    }
-                    if i in cached_system_prompts_index:
-                        prompt["cache_control"] = {"type": "ephemeral"}
-                    processed_system_prompts.append(prompt)
-                args["system"] = processed_system_prompts
+                        "cache_control": {"type": "ephemeral"}
+                    } if i in cached_system_prompts_index else {
+                        "type": "text",
+                        "text": prompt
+                    } for i, prompt in enumerate(system_prompt)
+                ]
             else:
                 if isinstance(system_prompt, str):
                     processed_system_prompts = [{
@@ -287,21 +404,21 @@ class AnthropicLlm(LlmBaseProvider):
                             }
                         } for prompt in system_prompt
                     ]
-                args["system"] = processed_system_prompts
+                return processed_system_prompts
+        return None
+
+    @staticmethod
+    def _thinking_template(budget_tokens :int)->Dict[str, Any]:
+        return {
+            "type": "enabled",
+            "budget_tokens": budget_tokens
+        }
 
     def _handle_thinking_models(self):
         thinking = getattr(self.config, "thinking", None)
-        if thinking:
-            if isinstance(thinking, bool):
-                self.completion_args["thinking"] = {
-                    "type": "enabled",
-                    "budget_tokens": self.config.max_tokens
-                }
-            elif isinstance(thinking, dict):
-                self.completion_args["thinking"] = {
-                    "type": "enabled",
-                    "budget_tokens": thinking.get("budget_tokens") or self.config.max_tokens
-                }
+        if thinking and isinstance(thinking, (bool, dict)):
+            budget_tokens = self.config.max_tokens if isinstance(thinking, bool) else (thinking.get("budget_tokens") or self.config.max_tokens)
+            self.completion_args["thinking"] = self._thinking_template(budget_tokens)
 
         if extra_query := getattr(self.config, "extra_query", None):
             self.completion_args["extra_query"] = extra_query
@@ -320,13 +437,7 @@ class AnthropicLlm(LlmBaseProvider):
         return {
             "name": tool.name,
             "description": tool.description,
-            "input_schema": {
-                "type": tool.input_schema.type,
-                "properties": tool.input_schema.properties.model_dump(),
-                "required": tool.input_schema.required,
-                **{k: v for k, v in tool.input_schema.model_dump().items() 
-                   if k not in ["type", "properties", "required"]}
-            }
+            "input_schema": tool.input_schema.to_parameters()
         }
     
     @staticmethod
@@ -368,7 +479,6 @@ class AnthropicLlm(LlmBaseProvider):
     def default_image_template(self, img :str)->Dict[str, str]:
         # TODO this logic needs to be mapped across other providers including BaseProvider
         if is_base64(img):
-            print("is_base64")
             return {
                 "type": "image",
                 "source": {
@@ -387,3 +497,12 @@ class AnthropicLlm(LlmBaseProvider):
                 }
             }
 
+# event type -> AnthropicLlm.normalize handler, events without one (i.e message_stop) are dropped
+_NORMALIZE_HANDLERS = {
+    "message_start": AnthropicLlm._normalize_message_start,
+    "message": AnthropicLlm._normalize_message,
+    "message_delta": AnthropicLlm._normalize_message_delta,
+    "content_block_start": AnthropicLlm._normalize_content_block_start,
+    "content_block_delta": AnthropicLlm._normalize_passthrough,
+    "content_block": AnthropicLlm._normalize_passthrough
+}
@@ -8,23 +8,101 @@ from aicore.llm.config import LlmConfig
 from aicore.llm.mcp.client import MCPClient, ToolExecutionCallback
 from aicore.llm.mcp.models import ToolCallSchema, ToolCalls, ToolSchema
 from aicore.logger import _logger, default_stream_handler
-from aicore.const import REASONING_START_TOKEN, REASONING_STOP_TOKEN, STREAM_START_TOKEN, STREAM_END_TOKEN, CUSTOM_MODELS, TOOL_CALL_END_TOKEN, TOOL_CALL_START_TOKEN
-from aicore.llm.utils import detect_image_type, is_base64, parse_content, image_to_base64
+from aicore.const import IMAGE_CACHE_MAX_BYTES, REASONING_START_TOKEN, REASONING_STOP_TOKEN, STREAM_START_TOKEN, STREAM_END_TOKEN, TOOL_CALL_END_TOKEN, TOOL_CALL_START_TOKEN, MESSAGE_ROLES
+from aicore.llm.utils import detect_image_type, is_base64, parse_content, image_to_base64, new_ulid
 from aicore.llm.usage import UsageInfo
 from aicore.models import AuthenticationError, ModelError
 from aicore.models_metadata import METADATA
 from aicore.observability.collector import LlmOperationCollector
 from typing import Any, Dict, Optional, Literal, List, Tuple, Union, Callable
 from pydantic import BaseModel, RootModel, Field
-from functools import partial, wraps
+from functools import cached_property, lru_cache, partial, wraps
+from concurrent.futures import Future, ThreadPoolExecutor
 from json_repair import repair_json
 from mcp.types import ImageContent
 from pathlib import Path
 import tiktoken
+import threading
 import asyncio
+import hashlib
+import orjson
 import json
 import time
-import ulid
+import os
+import re
+
+_JPEG_DATA_URI_PREFIX = "data:image/jpeg;base64,"
+_PROMPT_MODEL_TYPES = (BaseModel, RootModel)
+_COLLECTOR_LOCK = threading.Lock()
+# orjson reads integers past 64 bits as lossy floats, any 20+ digit run is left to json
+_LONG_DIGITS = re.compile(r"\d{20}")
+
+def _loads_json(text: str) -> Any:
+    if _LONG_DIGITS.search(text) is None:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass
+    # json also accepts the NaN and Infinity literals orjson rejects
+    return json.loads(text)
+
+@lru_cache(maxsize=256)
+def _resolve_tokenizer(model_name: str) -> str:
+    try:
+        tiktoken.encoding_name_for_model(model_name)
+        return model_name
+    except KeyError:
+        return "gpt-4o"
+
+@lru_cache(maxsize=64)
+def _encoding_for_model(model_name: str) -> tiktoken.Encoding:
+    # one shared Encoding per model, providers built for the same model reuse its bpe ranks
+    return tiktoken.encoding_for_model(_resolve_tokenizer(model_name))
+
+# path -> (mtime_ns, size, encoded), oldest first, bounded by the total length of the encoded strings
+_IMAGE_CACHE: Dict[str, Tuple[int, int, str]] = {}
+_IMAGE_CACHE_LOCK = threading.Lock()
+_image_cache_bytes = 0
+# shared by every multi image prompt instead of a pool per call
+_IMAGE_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="aicore-images")
+
+def _image_to_base64_cached(path_str: str, mtime_ns: int, size: int) -> str:
+    global _image_cache_bytes
+    with _IMAGE_CACHE_LOCK:
+        if (entry := _IMAGE_CACHE.get(path_str)) is not None and entry[:2] == (mtime_ns, size):
+            # reinsert as most recently used
+            _IMAGE_CACHE[path_str] = _IMAGE_CACHE.pop(path_str)
+            return entry[2]
+
+    encoded = image_to_base64(path_str)
+    if len(encoded) > IMAGE_CACHE_MAX_BYTES:
+        return encoded
+
+    with _IMAGE_CACHE_LOCK:
+        # an edited file replaces its previous encoding
+        if (previous := _IMAGE_CACHE.pop(path_str, None)) is not None:
+            _image_cache_bytes -= len(previous[2])
+        while _IMAGE_CACHE and _image_cache_bytes + len(encoded) > IMAGE_CACHE_MAX_BYTES:
+            _image_cache_bytes -= len(_IMAGE_CACHE.pop(next(iter(_IMAGE_CACHE)))[2])
+        _IMAGE_CACHE[path_str] = (mtime_ns, size, encoded)
+        _image_cache_bytes += len(encoded)
+    return encoded
+
+def _clear_image_cache():
+    global _image_cache_bytes
+    with _IMAGE_CACHE_LOCK:
+        _IMAGE_CACHE.clear()
+        _image_cache_bytes = 0
+
+def _encode_image(img: Union[str, Path, bytes]) -> str:
+    if isinstance(img, (str, Path)):
+        try:
+            stat = os.stat(img)
+        except (OSError, ValueError):
+            # base64 strings and urls are not files
+            return image_to_base64(img)
+        return _image_to_base64_cached(str(img), stat.st_mtime_ns, stat.st_size)
+    return image_to_base64(img)
 
 class LlmBaseProvider(BaseModel):
     """Base class for all LLM provider implementations.
@@ -45,11 +123,10 @@ class LlmBaseProvider(BaseModel):
         extras: Additional provider-specific data
         _client: Synchronous client instance
         _aclient: Asynchronous client instance
-        _collector: Observability collector instance
         _tool_callback: Optional callback for tool execution events
     """
     config: LlmConfig
-    session_id: str = Field(default_factory=ulid.ulid)
+    session_id: str = Field(default_factory=new_ulid)
     worspace: Optional[str]=None
     agent_id: Optional[str]=None
     extras: Optional[dict]=Field(default_factory=dict)
@@ -63,11 +140,13 @@ class LlmBaseProvider(BaseModel):
     _normalize_fn: Any = None
     _tokenizer_fn: Any = None
     _is_reasoner: bool = False
+    _stream_end_token: str = STREAM_END_TOKEN
     _auth_exception: Exception = Exception
-    _usage :Optional[UsageInfo]=None
-    _collector: Optional[LlmOperationCollector] = None
     _mcp: Optional[MCPClient] = None
     _n_sucessive_tool_calls :int=0
+    _collection_disabled :bool=False
+    # cache key -> (output, input tokens, output tokens) as reported by usage when the response was received
+    _response_cache: Optional[Dict[bytes, Tuple[str, int, int]]] = None
 
     @classmethod
     def from_config(cls, config: LlmConfig) -> "LlmBaseProvider":
@@ -123,6 +202,23 @@ class LlmBaseProvider(BaseModel):
         """
         self._aclient = aclient
 
+    def share_http_client(self, provider :"LlmBaseProvider")->bool:
+        """Reuse another provider's connection pool when both hit the same host.
+        
+        Args:
+            provider: Provider whose clients should be shared
+            
+        Returns:
+            bool: Whether the clients are now shared, providers without support return False
+        """
+        return False
+
+    async def aclose(self):
+        """Close the asynchronous client and its pooled connections."""
+        close = getattr(self._aclient, "close", None)
+        if close is not None and asyncio.iscoroutinefunction(close):
+            await close()
+
     def validate_config(self, force_check_against_provider :bool=False):
         """Validate provider configuration against available models.
         
@@ -133,6 +229,8 @@ class LlmBaseProvider(BaseModel):
             ModelError: If configured model is not available
             AuthenticationError: If provider authentication fails
         """
+        from aicore.const import CUSTOM_MODELS
+
         try:
             if self.config.model in CUSTOM_MODELS:
                 return
@@ -247,50 +345,62 @@ class LlmBaseProvider(BaseModel):
         """
         self._tokenizer_fn = tokenizer_fn
 
-    @property
+    # usage and collector are cached_properties: built on first access, then stored in the instance __dict__
+    # so later reads (several per completion) are plain attribute lookups, assigning them replaces the cached value
+    @cached_property
     def usage(self) -> UsageInfo:
         """Get usage information tracker.
         
         Returns:
             UsageInfo instance tracking token usage and costs
         """
-        if self._usage is None:
-            self._usage = UsageInfo.from_pricing_config(self.config.pricing)
-        return self._usage
+        return UsageInfo.from_pricing_config(self.config.pricing)
     
-    @usage.setter
-    def usage(self, usage :UsageInfo):
-        """Set usage information tracker.
-        
-        Args:
-            usage: UsageInfo instance to set
-        """
-        self._usage = usage
-    
-    @property
+    @cached_property
     def collector(self) -> Optional[LlmOperationCollector]:
         """Get the operation collector instance.
         
         Returns:
             LlmOperationCollector instance if configured, None otherwise
         """
-        if self._collector is None:
-            self._collector = LlmOperationCollector.fom_observable_storage_path()
-        return self._collector
-    
-    @collector.setter
-    def collector(self, collector: LlmOperationCollector):
-        """Set the operation collector instance.
-        
-        Args:
-            collector: LlmOperationCollector instance to set
-        """
-        self._collector = collector
+        # coroutines on one loop cannot race here, threads can and must share a single storage backend,
+        # cached_property only stores the value after returning so it is stored here under the lock
+        with _COLLECTOR_LOCK:
+            collector = self.__dict__.get("collector")
+            if collector is None:
+                collector = LlmOperationCollector.fom_observable_storage_path()
+                if self._collection_disabled:
+                    collector.is_enabled = False
+                self.__dict__["collector"] = collector
+        return collector
         
     def disable_collection(self):
-        """Disable data collection for this provider."""
-        if self._collector:
-            self._collector.is_enabled = False
+        """Disable data collection for this provider, without creating its collector if it was not used yet."""
+        # under the lock a collector being created concurrently either sees the flag or is returned here
+        with _COLLECTOR_LOCK:
+            self._collection_disabled = True
+            collector = self.__dict__.get("collector")
+        if collector is not None:
+            collector.is_enabled = False
+
+    def _record_in_background(self, **record)->Future:
+        """Queue a completion record on the collector's writer without holding the completion on its storage writes."""
+        return self.collector.submit_record(**record)
+
+    def flush_records(self):
+        """Block until the operation records queued by complete are written."""
+        if (collector := self.__dict__.get("collector")) is not None:
+            collector.flush()
+
+    async def aflush_records(self):
+        """Wait for the operation records queued by complete to be written."""
+        if (collector := self.__dict__.get("collector")) is not None:
+            await collector.aflush()
+
+    async def aclose_records(self):
+        """Write the queued operation records and stop the collector's writer thread."""
+        if (collector := self.__dict__.get("collector")) is not None:
+            await collector.aclose()
 
     @property
     def mcp(self)->MCPClient:
@@ -315,6 +425,13 @@ class LlmBaseProvider(BaseModel):
     def _tool_call_message(self, **kwargs)->Dict[str, str]:        
         raise NotImplementedError("the selected model-provider does not support tool calling")
 
+    async def batch_complete_offline(self,
+        prompts :List[Union[str, List[str], List[Dict[str, str]]]],
+        system_prompt :Optional[Union[List[str], str]]=None,
+        json_output :bool=False,
+        poll_interval :float=30)->List[Optional[Union[str, Dict]]]:
+        raise NotImplementedError("the selected model-provider does not support offline batch completions")
+
     @staticmethod
     def get_default_tokenizer(model_name: str) -> str:
         """Get default tokenizer name for a model.
@@ -325,11 +442,19 @@ class LlmBaseProvider(BaseModel):
         Returns:
             str: Tokenizer name (falls back to 'gpt-4o' if unknown)
         """
-        try:
-            tiktoken.encoding_name_for_model(model_name)
-            return model_name
-        except KeyError:
-            return "gpt-4o"
+        return _resolve_tokenizer(model_name)
+
+    @staticmethod
+    def get_default_encoding(model_name: str) -> tiktoken.Encoding:
+        """Get the shared tiktoken encoding for a model.
+        
+        Args:
+            model_name: Name of the model to get the encoding for
+            
+        Returns:
+            tiktoken.Encoding: Cached encoding for the model's default tokenizer
+        """
+        return _encoding_for_model(model_name)
         
     def default_text_template(self, text :str)->Dict[str, str]:
         return {
@@ -341,7 +466,7 @@ class LlmBaseProvider(BaseModel):
         if is_base64(img):
             return {
                 "type": "image_url",
-                "image_url": {"url": f"data:image/jpeg;base64,{img}"}
+                "image_url": {"url": _JPEG_DATA_URI_PREFIX + img}
             }
         return {
             "type": "image_url",
@@ -374,14 +499,17 @@ class LlmBaseProvider(BaseModel):
             Union[str, List[Dict]]: Formatted message content as string or list of content parts
         """
         if isinstance(prompt, str):
+            if img_b64_str is None:
+                # the common single text prompt
+                return [self.default_text_template(prompt)]
             prompt = [prompt]
 
         message_content = [
             self.default_text_template(_prompt) for _prompt in prompt
         ]
         if img_b64_str is not None:
-            for img in img_b64_str:
-                message_content.append(self.default_image_template(img))
+            image_template = self.default_image_template
+            message_content.extend(image_template(img) for img in img_b64_str)
 
         return message_content
     
@@ -430,6 +558,8 @@ class LlmBaseProvider(BaseModel):
         self.completion_fn = partial(self.completion_fn, stop=stop_thinking_token)
         self.acompletion_fn = self.async_partial(self.acompletion_fn, stop=stop_thinking_token)
         self._is_reasoner = True
+        # resolved once here so streams don't branch on _is_reasoner when closing
+        self._stream_end_token = REASONING_STOP_TOKEN
 
     def _message_body(self, prompt: Union[List[str], str], role: Literal["user", "system", "assistant"] = "user", img_b64_str: Optional[List[str]] = None, _last: Optional[bool] = False) -> Dict:
         """Create message body for API requests.
@@ -450,20 +580,24 @@ class LlmBaseProvider(BaseModel):
         return message_body
 
     @staticmethod
-    def _validte_message_dict(message_dict: Dict[str, str]) -> bool:
+    def _validte_message_dict(message_dict: Dict[str, str], roles :frozenset=MESSAGE_ROLES) -> bool:
         """Validate message dictionary structure.
         
         Args:
             message_dict: Message dictionary to validate
+            roles: Roles accepted by the provider
             
         Returns:
             bool: True if valid
             
         Raises:
-            AssertionError: If message structure is invalid
+            ValueError: If message structure is invalid
         """
-        assert message_dict.get("role") in ["user", "system", "assistant", "tool"], f"{message_dict} 'role' attribute must be one of ['user', 'system', 'assistant', 'tool]"
-        assert message_dict.get("content") is not None or message_dict.get("tool_calls") is not None, f"{message_dict} 'content' or 'tool_calls' attribute is missing"
+        # explicit checks rather than asserts, which python -O strips
+        if message_dict.get("role") not in roles:
+            raise ValueError(f"{message_dict} 'role' attribute must be one of {sorted(roles)}")
+        if message_dict.get("content") is None and message_dict.get("tool_calls") is None:
+            raise ValueError(f"{message_dict} 'content' or 'tool_calls' attribute is missing")
         return True
 
     def _map_multiple_prompts(self, prompt: Union[List[str], List[Dict[str, str]]]) -> List[str]:
@@ -480,8 +614,10 @@ class LlmBaseProvider(BaseModel):
             "user": "assistant"
         }
         role = "user"
-        prompt_messages = []
-        for _prompt in prompt[::-1]:
+        # roles are anchored on the last message, walk backwards filling the slots in place
+        prompt_messages = [None] * len(prompt)
+        for i in range(len(prompt) - 1, -1, -1):
+            _prompt = prompt[i]
             if isinstance(_prompt, str):
                 _prompt = self._message_body(_prompt, role=role)
 
@@ -493,9 +629,9 @@ class LlmBaseProvider(BaseModel):
                 role = _prompt.get("role")
             
             role = next_role_maps.get(role)
-            prompt_messages.append(_prompt)
+            prompt_messages[i] = _prompt
 
-        return prompt_messages[::-1]
+        return prompt_messages
     
     def _handle_system_prompt(self,
         messages :list,
@@ -557,20 +693,20 @@ class LlmBaseProvider(BaseModel):
         if prefix_prompt is not None:
             messages.append(self._message_body(prefix_prompt, role="assistant", _last=True))
         
-        args = dict(
-            model=self.config.model,
-            temperature=self.config.temperature,
-            max_tokens=self.config.max_tokens,
-            messages=messages,
-            tools=tools,
-            tool_choice=self.config.tool_choice,
-            stream=stream
-        )
-        
-        if self.completion_args:
-            if not stream:
-                self.completion_args.pop("stream_options", None)
-            args.update(self.completion_args)
+        config = self.config
+        args = {
+            "model": config.model,
+            "temperature": config.temperature,
+            "max_tokens": config.max_tokens,
+            "messages": messages,
+            "tools": tools,
+            "tool_choice": config.tool_choice,
+            "stream": stream,
+            **self.completion_args
+        }
+        if not stream:
+            # dropped from this request only, completion_args must keep it for the next streamed one
+            args.pop("stream_options", None)
 
         self._handle_openai_response_only_models(args)
         self._handle_special_sys_prompt_anthropic(args, system_prompt)
@@ -579,16 +715,76 @@ class LlmBaseProvider(BaseModel):
         
         return args
     
+    def _response_cache_key(self, completion_args :Dict)->Optional[bytes]:
+        """
+        Only deterministic requests are cached: non streamed, without tools and at temperature 0.
+        The key is a blake2b digest of every completion arg (model, messages, system prompt, sampling
+        and provider specific args) serialized with sorted keys, so any change to the request is a miss.
+        Requests holding values without an exact json form (i.e pydantic response_format classes, bytes)
+        are not cached. Entries never expire, the least recently used one is evicted once
+        config.response_cache_size is reached.
+        """
+        if not self.config.response_cache_size or self.config.temperature > 0:
+            return None
+        if completion_args.get("stream") or completion_args.get("tools"):
+            return None
+        try:
+            # no default= fallback, str() of arbitrary objects can collide or embed their addresses
+            payload = json.dumps(completion_args, sort_keys=True)
+        except (TypeError, ValueError):
+            return None
+        return hashlib.blake2b(payload.encode(), digest_size=16).digest()
+
+    def _cached_response(self, cache_key :Optional[bytes])->Optional[Tuple[str, int, int]]:
+        if cache_key is None or not self._response_cache:
+            return None
+        cached = self._response_cache.pop(cache_key, None)
+        if cached is not None:
+            # reinsert as most recently used
+            self._response_cache[cache_key] = cached
+        return cached
+
+    def _cache_response(self, cache_key :Optional[bytes], output :Any, input_tokens :int, output_tokens :int):
+        if cache_key is None or not isinstance(output, str):
+            return
+        if self._response_cache is None:
+            self._response_cache = {}
+        elif len(self._response_cache) >= self.config.response_cache_size:
+            del self._response_cache[next(iter(self._response_cache))]
+        self._response_cache[cache_key] = (output, input_tokens, output_tokens)
+
+    def _cache_hit_record(self, cached :Tuple[str, int, int], **record)->Dict:
+        """Record fields of a response served from the cache, the prompt counted as cached and nothing billed"""
+        output, input_tokens, output_tokens = cached
+        return dict(
+            response=output,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            cached_tokens=input_tokens,
+            cost=0,
+            extras={**(self.extras or {}), "cached": True},
+            **record
+        )
+
     @staticmethod
-    def _img_to_base64(img_path :Optional[Union[Union[str, Path, bytes], List[Union[str, Path, bytes]]]] = None):
+    def _img_to_base64(img_path :Optional[Union[Union[str, Path, bytes], List[Union[str, Path, bytes]], Tuple[Union[str, Path, bytes], ...]]] = None):
         if img_path is None:
             return None
-        elif not isinstance(img_path, list):
-            img_path = [img_path]
-        return [
-            image_to_base64(img)
-            for img in img_path
-        ]
+        elif isinstance(img_path, (str, Path, bytes)):
+            img_path = (img_path,)
+        if len(img_path) < 2:
+            return [
+                _encode_image(img)
+                for img in img_path
+            ]
+        # file reads and encodings are independent, overlap them instead of paying their sum
+        return list(_IMAGE_POOL.map(_encode_image, img_path))
+
+    @classmethod
+    async def _aimg_to_base64(cls, img_path :Optional[Union[Union[str, Path, bytes], List[Union[str, Path, bytes]], Tuple[Union[str, Path, bytes], ...]]] = None):
+        if img_path is None:
+            return None
+        return await asyncio.to_thread(cls._img_to_base64, img_path)
 
     def _prepare_completion_args(self,
         prompt: Union[str, List[str], List[Dict[str, str]]], 
@@ -721,20 +917,27 @@ class LlmBaseProvider(BaseModel):
         """
         message = [] 
         _skip = False
-        completeion_id = ulid.ulid()
+        completeion_id = new_ulid()
+        # bound once, these run for every streamed chunk
+        normalize_fn = self.normalize_fn
+        handle_stream_messages = self._handle_stream_messages
         for chunk in stream:
-            _chunk = self.normalize_fn(chunk, completeion_id)
+            _chunk = normalize_fn(chunk, completeion_id)
             if _chunk:
-                _skip = self._handle_stream_messages(_chunk, message, _skip)
+                _skip = handle_stream_messages(_chunk, message, _skip)
 
-        if self._is_reasoner:
-            default_stream_handler(REASONING_STOP_TOKEN)
-        else:
-            default_stream_handler(STREAM_END_TOKEN)
+        default_stream_handler(self._stream_end_token)
 
         response = "".join(message)
         return response
     
+    @staticmethod
+    async def _flush_logger_fn(logger_fn):
+        """Flush chunks buffered by batching logger functions (i.e SessionLogger)"""
+        flush = getattr(logger_fn, "flush", None)
+        if flush is not None:
+            await flush()
+
     async def _astream(self, stream, logger_fn, prefix_prompt: Optional[Union[str, List[str]]] = None) -> Union[str, ToolCalls]:
         """Handle streaming response from asynchronous completion.
         
@@ -748,33 +951,41 @@ class LlmBaseProvider(BaseModel):
         """
         message :List[Union[str, ToolCallSchema]] = []
         _skip = False
-        completeion_id = ulid.ulid()
+        completeion_id = new_ulid()
         await logger_fn(STREAM_START_TOKEN) if not prefix_prompt else ...
         _calling_tool = False
         tool_calls = ToolCalls()
-        async for chunk in stream:
-            _chunk = self.normalize_fn(chunk, completeion_id)
-            if _chunk:
-                _skip = await self._handle_astream_messages(_chunk, logger_fn, message, _skip)
-
-            if self._is_tool_call(_chunk):
-                ### TODO recheck this line to ensure it covers multiple tool calling in stream mode
-                tool_chunk = self._tool_chunk_from_provider(_chunk)
-                if not _calling_tool:
-                    _calling_tool = True
-                    await logger_fn(TOOL_CALL_START_TOKEN)
-                    tool_call = self._fill_tool_schema(tool_chunk)
-                    continue
-
-                if self._tool_call_change_condition(tool_chunk):
-                    if message:
-                        ### cover anthropic
-                        tool_call._raw = "\n".join(message)
-                    tool_calls.root.append(tool_call)
-                    tool_call = self._fill_tool_schema(tool_chunk)
-                    continue
+        # bound once, these run for every streamed chunk
+        normalize_fn = self.normalize_fn
+        handle_astream_messages = self._handle_astream_messages
+        is_tool_call = self._is_tool_call
+        try:
+            async for chunk in stream:
+                _chunk = normalize_fn(chunk, completeion_id)
+                if _chunk:
+                    _skip = await handle_astream_messages(_chunk, logger_fn, message, _skip)
+
+                if is_tool_call(_chunk):
+                    ### TODO recheck this line to ensure it covers multiple tool calling in stream mode
+                    tool_chunk = self._tool_chunk_from_provider(_chunk)
+                    if not _calling_tool:
+                        _calling_tool = True
+                        await logger_fn(TOOL_CALL_START_TOKEN)
+                        tool_call = self._fill_tool_schema(tool_chunk)
+                        continue
+
+                    if self._tool_call_change_condition(tool_chunk):
+                        if message:
+                            ### cover anthropic
+                            tool_call._raw = "\n".join(message)
+                        tool_calls.root.append(tool_call)
+                        tool_call = self._fill_tool_schema(tool_chunk)
+                        continue
                 
-                tool_call = self._handle_tool_call_stream(tool_call, tool_chunk)
+                    tool_call = self._handle_tool_call_stream(tool_call, tool_chunk)
+        finally:
+            # a stream failing midway still emits the chunks buffered by the logger
+            await self._flush_logger_fn(logger_fn)
         
         if _calling_tool:
             ### colect last call
@@ -784,10 +995,7 @@ class LlmBaseProvider(BaseModel):
             tool_calls.root.append(tool_call)
             return tool_calls
         
-        if self._is_reasoner:
-            await logger_fn(REASONING_STOP_TOKEN)
-        else:
-            await logger_fn(STREAM_END_TOKEN)
+        await logger_fn(self._stream_end_token)
         response = "".join(message)
         return response
     
@@ -853,7 +1061,7 @@ class LlmBaseProvider(BaseModel):
                     tool_names = [tool_call.name for tool_call in tool_calls]
                     # Log the start of tool execution
                     _logger.logger.info(f"Executing {len(tool_calls)} tools: {tool_names}")
-                    start_time = time.time()
+                    start_time = time.perf_counter()
                     
                     tool_coroutines = [
                         self.mcp.servers.call_tool(
@@ -875,7 +1083,7 @@ class LlmBaseProvider(BaseModel):
                             self._tool_call_message(toolCallSchema=tool_call, content=tool_call_response),
                         ])
 
-                    execution_time = time.time() - start_time
+                    execution_time = time.perf_counter() - start_time
                     _logger.logger.info(f"Finished executing {len(tool_calls)} tools in {execution_time:.2f} seconds")
                 else:
                     # If there's only one tool call, execute it directly
@@ -901,13 +1109,18 @@ class LlmBaseProvider(BaseModel):
 
     @staticmethod
     def model_to_str(model: Union[BaseModel, RootModel]) -> str:
-        """Convert model to JSON string representation."""
-        return f"```json\n{model.model_dump_json(indent=4)}\n```"
+        """Convert model to compact JSON string representation, indentation only adds prompt tokens."""
+        return f"```json\n{model.model_dump_json()}\n```"
     
     @staticmethod
     def extract_json(output: str) -> Dict:
+        # json response formats return bare json, only scan for fenced blocks when that fails
+        try:
+            return _loads_json(output)
+        except json.JSONDecodeError:
+            pass
         try:
-            return json.loads(parse_content(output))
+            return _loads_json(parse_content(output))
         except json.JSONDecodeError:
             return output
   
@@ -953,11 +1166,11 @@ class LlmBaseProvider(BaseModel):
             The completion result as either a string or dictionary (if json_output=True)
         """
         img_b64_str = self._img_to_base64(img_path)
-        if isinstance(prompt, Union[BaseModel, RootModel]):
+        if isinstance(prompt, _PROMPT_MODEL_TYPES):
             prompt = self.model_to_str(prompt)
         
         # Start tracking operation time
-        start_time = time.time()
+        start_time = time.perf_counter()
         input_tokens = 0
         output_tokens = 0
         cost = 0
@@ -969,6 +1182,23 @@ class LlmBaseProvider(BaseModel):
             img_b64_str=img_b64_str,
             stream=stream
         )
+
+        cache_key = self._response_cache_key(completion_args)
+        if (cached := self._cached_response(cache_key)) is not None:
+            output = cached[0]
+            if self.collector:
+                self._record_in_background(**self._cache_hit_record(
+                    cached,
+                    provider=self.config.provider,
+                    operation_type="completion",
+                    completion_args=completion_args,
+                    session_id=self.session_id,
+                    workspace=self.worspace,
+                    agent_id=agent_id or self.agent_id,
+                    action_id=action_id,
+                    latency_ms=(time.perf_counter() - start_time) * 1000
+                ))
+            return output if not json_output else self.extract_json(output)
         
         output = None
         error_message = None
@@ -980,13 +1210,16 @@ class LlmBaseProvider(BaseModel):
             else:
                 output = self._no_stream(output)
 
-            if self.usage:
-                if self.usage.latest_completion:
-                    _logger.logger.info(str(self.usage.latest_completion))
-                    input_tokens = self.usage.latest_completion.prompt_tokens
-                    output_tokens = self.usage.latest_completion.response_tokens
-                    cost = self.usage.latest_completion.cost
-                _logger.logger.info(str(self.usage))
+            if usage := self.usage:
+                # latest_completion re-aggregates the usage records on every access, resolve it once
+                if latest_completion := usage.latest_completion:
+                    _logger.logger.info(str(latest_completion))
+                    input_tokens = latest_completion.prompt_tokens
+                    output_tokens = latest_completion.response_tokens
+                    cost = latest_completion.cost
+                _logger.logger.info(str(usage))
+            # replayed hits are recorded with the tokens reported for the original request
+            self._cache_response(cache_key, output, input_tokens, output_tokens)
             
             output = output if not json_output else self.extract_json(output)
 
@@ -996,11 +1229,11 @@ class LlmBaseProvider(BaseModel):
             raise e
         
         finally:
-            end_time = time.time()
+            end_time = time.perf_counter()
             latency_ms = (end_time - start_time) * 1000
             
             if self.collector:
-                self.collector.record_completion(
+                self._record_in_background(
                     provider=self.config.provider,
                     operation_type="completion",
                     completion_args=completion_args,
@@ -1049,8 +1282,8 @@ class LlmBaseProvider(BaseModel):
         Returns:
             The completion result as either a string or dictionary (if json_output=True)
         """
-        img_b64_str = self._img_to_base64(img_path)
-        if isinstance(prompt, Union[BaseModel, RootModel]):
+        img_b64_str = await self._aimg_to_base64(img_path)
+        if isinstance(prompt, _PROMPT_MODEL_TYPES):
             prompt = self.model_to_str(prompt)
         elif isinstance(prompt, str):            
             prompt = [self._message_body([prompt], role="user", img_b64_str=img_b64_str)]
@@ -1058,7 +1291,7 @@ class LlmBaseProvider(BaseModel):
         stream_handler = stream_handler or default_stream_handler
         
         # Start tracking operation time
-        start_time = time.time()
+        start_time = time.perf_counter()
         input_tokens = 0
         output_tokens = 0
         cost = 0
@@ -1073,6 +1306,29 @@ class LlmBaseProvider(BaseModel):
             tools=self.tools if self._has_not_exceeded_tool_calls else None,
             stream=stream
         )
+
+        cache_key = self._response_cache_key(completion_args)
+        if (cached := self._cached_response(cache_key)) is not None:
+            output = cached[0]
+            if self.collector:
+                await self.collector.arecord_completion(**self._cache_hit_record(
+                    cached,
+                    provider=self.config.provider,
+                    operation_type="acompletion",
+                    completion_args=completion_args,
+                    session_id=self.session_id,
+                    workspace=self.worspace,
+                    agent_id=agent_id or self.agent_id,
+                    action_id=action_id,
+                    latency_ms=(time.perf_counter() - start_time) * 1000
+                ))
+            output = output if not json_output else self.extract_json(output)
+            if as_message_records:
+                records = self._get_message_records(completion_args, excluded_roles=["system"])
+                records.append({"role": "assistant", "content": output})
+                output = records
+            return output
+
         output = None 
         call_tool = False
         error_message = None
@@ -1085,13 +1341,16 @@ class LlmBaseProvider(BaseModel):
             else:
                 output = self._no_stream(output)
             
-            if self.usage:
-                if self.usage.latest_completion:
-                    _logger.logger.info(str(self.usage.latest_completion))
-                    input_tokens = self.usage.latest_completion.prompt_tokens
-                    output_tokens = self.usage.latest_completion.response_tokens
-                    cost = self.usage.latest_completion.cost
-                _logger.logger.info(str(self.usage))
+            if usage := self.usage:
+                # latest_completion re-aggregates the usage records on every access, resolve it once
+                if latest_completion := usage.latest_completion:
+                    _logger.logger.info(str(latest_completion))
+                    input_tokens = latest_completion.prompt_tokens
+                    output_tokens = latest_completion.response_tokens
+                    cost = latest_completion.cost
+                _logger.logger.info(str(usage))
+            # replayed hits are recorded with the tokens reported for the original request
+            self._cache_response(cache_key, output, input_tokens, output_tokens)
             
             ### handle scenarios of text + toolcalssblock i.e anthropic
             _is_not_list = False
@@ -1113,10 +1372,8 @@ class LlmBaseProvider(BaseModel):
                 messages.extend(tools_messages)
                 self._n_sucessive_tool_calls += 1
 
-                print(f"{messages=}")
-
                 if self.collector:
-                    end_time = time.time()
+                    end_time = time.perf_counter()
                     latency_ms = (end_time - start_time) * 1000
                     await self.collector.arecord_completion(
                         provider=self.config.provider,
@@ -1161,7 +1418,7 @@ class LlmBaseProvider(BaseModel):
         
         finally:
             if not call_tool and self.collector:
-                end_time = time.time()
+                end_time = time.perf_counter()
                 latency_ms = (end_time - start_time) * 1000
                 await self.collector.arecord_completion(
                     provider=self.config.provider,
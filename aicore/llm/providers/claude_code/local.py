@@ -479,7 +479,7 @@ class ClaudeCodeLlm(ClaudeCodeBase):
 
         stream_handler = stream_handler or default_stream_handler
 
-        start_time = time.time()
+        start_time = time.perf_counter()
         input_tokens = 0
         output_tokens = 0
         cost: Optional[float] = None
@@ -532,7 +532,7 @@ class ClaudeCodeLlm(ClaudeCodeBase):
             error_message = str(e)
             raise
         finally:
-            end_time = time.time()
+            end_time = time.perf_counter()
             latency_ms = (end_time - start_time) * 1000
 
             if self.collector:
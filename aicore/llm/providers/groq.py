@@ -6,7 +6,6 @@ from groq import Groq, AsyncGroq, AuthenticationError
 from groq.types.chat import ChatCompletionChunk
 from typing import Any, Dict, List, Optional, Union
 from typing_extensions import Self
-import tiktoken
 
 class GroqLlm(LlmBaseProvider):
 
@@ -28,10 +27,8 @@ class GroqLlm(LlmBaseProvider):
 
         self.normalize_fn = self.normalize
 
-        self.tokenizer_fn = tiktoken.encoding_for_model(
-            self.get_default_tokenizer(
-                self.config.model
-            )
+        self.tokenizer_fn = self.get_default_encoding(
+            self.config.model
         ).encode
 
         self._handle_reasoning_models()
@@ -65,13 +62,7 @@ class GroqLlm(LlmBaseProvider):
             "function": {
                 "name": tool.name,
                 "description": tool.description,
-                "parameters": {
-                    "type": tool.input_schema.type,
-                    "properties": tool.input_schema.properties.model_dump(),
-                    "required": tool.input_schema.required,
-                    **{k: v for k, v in tool.input_schema.model_dump().items() 
-                       if k not in ["type", "properties", "required"]}
-                }
+                "parameters": tool.input_schema.to_parameters()
             }
         }
     
@@ -1,14 +1,13 @@
 from aicore.llm.mcp.models import ToolCallSchema, ToolCalls, ToolSchema
 from aicore.llm.providers.base_provider import LlmBaseProvider
 from aicore.logger import default_stream_handler
-from aicore.const import STREAM_START_TOKEN, STREAM_END_TOKEN, REASONING_STOP_TOKEN, TOOL_CALL_START_TOKEN
+from aicore.const import STREAM_START_TOKEN, REASONING_STOP_TOKEN, TOOL_CALL_START_TOKEN
 from pydantic import model_validator
 # from mistral_common.protocol.instruct.messages import UserMessage
 # from mistral_common.tokens.tokenizers.mistral import MistralTokenizer
 from mistralai import Mistral, CompletionEvent, CompletionResponseStreamChoice, models
 from typing import Any, Optional, Union, List, Literal, Dict
 from typing_extensions import Self
-import tiktoken
 
 #TODO replace Tiktoken with Mistral tekken encoder when it is updated to work on python 3.13#
 class MistralLlm(LlmBaseProvider):
@@ -25,10 +24,8 @@ class MistralLlm(LlmBaseProvider):
         self.completion_fn = self.client.chat.stream
         self.acompletion_fn = self.client.chat.stream_async
         self.normalize_fn = self.normalize
-        self.tokenizer_fn = tiktoken.encoding_for_model(
-            self.get_default_tokenizer(
-                self.config.model
-            )
+        self.tokenizer_fn = self.get_default_encoding(
+            self.config.model
         ).encode
 
         return self
@@ -59,13 +56,16 @@ class MistralLlm(LlmBaseProvider):
         prefix_prompt = "".join(prefix_prompt) if isinstance(prefix_prompt, list) else prefix_prompt
         prefix_buffer = []
         prefix_completed = not bool(prefix_prompt)
+        # bound once, these run for every streamed chunk
+        normalize_fn = self.normalize_fn
+        append = message.append
         for chunk in stream:
-            _chunk = self.normalize_fn(chunk)
+            _chunk = normalize_fn(chunk)
             if _chunk:
                 chunk_message = _chunk[0].delta.content or ""
                 if prefix_completed:
                     default_stream_handler(chunk_message)
-                    message.append(chunk_message)
+                    append(chunk_message)
                 else:
                     prefix_buffer.append(chunk_message)
                     if "".join(prefix_buffer) == prefix_prompt:
@@ -87,41 +87,49 @@ class MistralLlm(LlmBaseProvider):
         prefix_prompt = "".join(prefix_prompt) if isinstance(prefix_prompt, list) else prefix_prompt
         prefix_buffer = []
         prefix_completed = not bool(prefix_prompt)
-        
-        async for chunk in stream:
-            _chunk = self.normalize_fn(chunk)
-            if _chunk:
-                chunk_message = _chunk[0].delta.content or ""
-                if prefix_completed and isinstance(chunk_message, str) and chunk_message:
-                    await logger_fn(chunk_message)
-                    message.append(chunk_message)
-                elif isinstance(chunk_message, list):
-                    ### ignore aditional mistral information like citations for now
-                    pass
-                else:
-                    prefix_buffer.append(chunk_message)
-                    if "".join(prefix_buffer) == prefix_prompt:
-                        prefix_completed = True
-                        await logger_fn(STREAM_START_TOKEN)
+        # bound once, these run for every streamed chunk
+        normalize_fn = self.normalize_fn
+        is_tool_call = self._is_tool_call
+        append = message.append
+
+        try:
+            async for chunk in stream:
+                _chunk = normalize_fn(chunk)
+                if _chunk:
+                    chunk_message = _chunk[0].delta.content or ""
+                    if prefix_completed and isinstance(chunk_message, str) and chunk_message:
+                        await logger_fn(chunk_message)
+                        append(chunk_message)
+                    elif isinstance(chunk_message, list):
+                        ### ignore aditional mistral information like citations for now
+                        pass
+                    else:
+                        prefix_buffer.append(chunk_message)
+                        if "".join(prefix_buffer) == prefix_prompt:
+                            prefix_completed = True
+                            await logger_fn(STREAM_START_TOKEN)
 
-            if self._is_tool_call(_chunk):
-                ### TODO recheck this line to ensure it covers multiple tool calling in stream mode
-                tool_chunk = self._tool_chunk_from_provider(_chunk)
-                if not _calling_tool:
-                    _calling_tool = True
-                    await logger_fn(TOOL_CALL_START_TOKEN)
-                    tool_call = self._fill_tool_schema(tool_chunk)
-                    continue
+                if is_tool_call(_chunk):
+                    ### TODO recheck this line to ensure it covers multiple tool calling in stream mode
+                    tool_chunk = self._tool_chunk_from_provider(_chunk)
+                    if not _calling_tool:
+                        _calling_tool = True
+                        await logger_fn(TOOL_CALL_START_TOKEN)
+                        tool_call = self._fill_tool_schema(tool_chunk)
+                        continue
 
-                if self._tool_call_change_condition(tool_chunk):
-                    if message:
-                        ### cover anthropic
-                        tool_call._raw = "\n".join(message)
-                    tool_calls.root.append(tool_call)
-                    tool_call = self._fill_tool_schema(tool_chunk)
-                    continue
+                    if self._tool_call_change_condition(tool_chunk):
+                        if message:
+                            ### cover anthropic
+                            tool_call._raw = "\n".join(message)
+                        tool_calls.root.append(tool_call)
+                        tool_call = self._fill_tool_schema(tool_chunk)
+                        continue
                 
-                tool_call = self._handle_tool_call_stream(tool_call, tool_chunk)
+                    tool_call = self._handle_tool_call_stream(tool_call, tool_chunk)
+        finally:
+            # a stream failing midway still emits the chunks buffered by the logger
+            await self._flush_logger_fn(logger_fn)
         
         if _calling_tool:
             ### colect last call
@@ -131,10 +139,7 @@ class MistralLlm(LlmBaseProvider):
             tool_calls.root.append(tool_call)
             return tool_calls
         
-        if self._is_reasoner:
-            await logger_fn(REASONING_STOP_TOKEN)
-        else:
-            await logger_fn(STREAM_END_TOKEN)
+        await logger_fn(self._stream_end_token)
         response = "".join(message)
         return response
     
@@ -151,13 +156,7 @@ class MistralLlm(LlmBaseProvider):
             "function": {
                 "name": tool.name,
                 "description": tool.description,
-                "parameters": {
-                    "type": tool.input_schema.type,
-                    "properties": tool.input_schema.properties.model_dump(),
-                    "required": tool.input_schema.required,
-                    **{k: v for k, v in tool.input_schema.model_dump().items() 
-                       if k not in ["type", "properties", "required"]}
-                }
+                "parameters": tool.input_schema.to_parameters()
             }
         }
     
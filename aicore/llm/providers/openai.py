@@ -2,7 +2,7 @@ from aicore.llm.providers.base_provider import LlmBaseProvider
 from aicore.llm.mcp.models import ToolCallSchema, ToolCalls, ToolSchema
 from aicore.llm.utils import detect_image_type, is_base64
 from aicore.logger import default_stream_handler
-from aicore.const import OPENAI_NO_TEMPERATURE_MODELS, OPENAI_RESPONSE_API_MODELS
+from aicore.const import OPENAI_NO_TEMPERATURE_MODELS, OPENAI_RESPONSE_API_MODELS, MESSAGE_ROLES
 from pydantic import model_validator
 from openai import OpenAI, AsyncOpenAI, AuthenticationError
 from openai.types.chat import ChatCompletion
@@ -14,51 +14,132 @@ from openai.types.responses import (
 )
 
 from openai.types.responses.response_function_call_arguments_delta_event import ResponseFunctionCallArgumentsDeltaEvent
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 from typing_extensions import Self
-import tiktoken
+import threading
+import weakref
+import asyncio
+import json
+
+# https://platform.openai.com/docs/guides/batch#4-check-the-status-of-a-batch
+_BATCH_TERMINAL_STATUSES = frozenset({"completed", "failed", "expired", "cancelled"})
+_OPENAI_MESSAGE_ROLES = MESSAGE_ROLES | {"developer"}
+
+# clients are shared by every openai compatible provider with the same credentials and base url so they reuse
+# one connection pool, async clients are additionally scoped to the running event loop their httpx pool binds to
+_CLIENTS: Dict[tuple, OpenAI] = {}
+_ACLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[tuple, AsyncOpenAI]]" = weakref.WeakKeyDictionary()
+_CLIENTS_LOCK = threading.Lock()
+
+def _get_client(api_key :Optional[str], base_url :Optional[str])->OpenAI:
+    key = (api_key, base_url)
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(key)
+        if client is None:
+            client = _CLIENTS[key] = OpenAI(api_key=api_key, base_url=base_url)
+    return client
+
+def _get_aclient(api_key :Optional[str], base_url :Optional[str])->Tuple[AsyncOpenAI, bool]:
+    """Return the async client and whether it is shared, dedicated clients are closed by their provider"""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # no loop to scope the pool to yet, keep a dedicated client
+        return AsyncOpenAI(api_key=api_key, base_url=base_url), False
+
+    key = (api_key, base_url)
+    with _CLIENTS_LOCK:
+        loop_clients = _ACLIENTS.setdefault(loop, {})
+        aclient = loop_clients.get(key)
+        if aclient is None:
+            aclient = loop_clients[key] = AsyncOpenAI(api_key=api_key, base_url=base_url)
+    return aclient, True
+
+def close_all_clients():
+    """Close the shared sync clients and drop every cached client, i.e on interpreter teardown"""
+    with _CLIENTS_LOCK:
+        for client in _CLIENTS.values():
+            client.close()
+        _CLIENTS.clear()
+        _ACLIENTS.clear()
+
+async def aclose_all_clients():
+    """Close the shared sync clients and the async clients bound to the running loop, i.e on application shutdown"""
+    loop = asyncio.get_running_loop()
+    with _CLIENTS_LOCK:
+        clients = list(_CLIENTS.values())
+        _CLIENTS.clear()
+        aclients = list(_ACLIENTS.pop(loop, {}).values())
+    for client in clients:
+        client.close()
+    for aclient in aclients:
+        await aclient.close()
 
 class OpenAiLlm(LlmBaseProvider):
     base_url :Optional[str]=None
     _use_responses_api :Optional[bool]=None
+    _owns_aclient :bool=False
 
     @model_validator(mode="after")
     def set_openai(self)->Self:
 
-        self.client :OpenAI = OpenAI(
+        self.client :OpenAI = _get_client(
             api_key=self.config.api_key,
             base_url=self.base_url or self.config.base_url
         )
-        _aclient :AsyncOpenAI = AsyncOpenAI(
+        _aclient, shared = _get_aclient(
             api_key=self.config.api_key,
             base_url=self.base_url or self.config.base_url
         )
         self._auth_exception = AuthenticationError
         self.validate_config()
         self.aclient = _aclient
-        
-        if self.use_responses_api:
-            self.completion_fn = self.client.responses.create
-            self.acompletion_fn = _aclient.responses.create
-        else:
-            self.completion_fn = self.client.chat.completions.create
-            self.acompletion_fn = _aclient.chat.completions.create
+        self._owns_aclient = not shared
+        self._bind_completion_fns()
             
         self.completion_args["stream_options"] = {
             "include_usage": True
         }
         self.normalize_fn = self.normalize
 
-        self.tokenizer_fn = tiktoken.encoding_for_model(
-            self.get_default_tokenizer(
-                self.config.model
-            )
+        self.tokenizer_fn = self.get_default_encoding(
+            self.config.model
         ).encode
 
         self._handle_reasoning_models()
 
         return self
 
+    def _bind_completion_fns(self):
+        if self.use_responses_api:
+            self.completion_fn = self.client.responses.create
+            self.acompletion_fn = self.aclient.responses.create
+        else:
+            self.completion_fn = self.client.chat.completions.create
+            self.acompletion_fn = self.aclient.chat.completions.create
+
+    async def aclose(self):
+        """Close a dedicated async client, shared clients are released through aclose_all_clients instead."""
+        if self._owns_aclient:
+            self._owns_aclient = False
+            await self.aclient.close()
+
+    def share_http_client(self, provider :LlmBaseProvider)->bool:
+        """
+        Reuse the connection pools of another openai compatible provider targeting the same base url,
+        copied clients keep this provider's api key but share the underlying httpx clients
+        """
+        if not isinstance(provider, OpenAiLlm) or provider.aclient is None:
+            return False
+        if str(provider.aclient.base_url) != str(self.aclient.base_url):
+            return False
+        self.client = provider.client.copy(api_key=self.config.api_key)
+        self.aclient = provider.aclient.copy(api_key=self.config.api_key)
+        # the copy wraps the other provider's httpx pool, closing it is left to its owner
+        self._owns_aclient = False
+        self._bind_completion_fns()
+        return True
+
     def normalize(self, chunk :ChatCompletion, completion_id :Optional[str]=None):
         if self.use_responses_api:
             return self.normalize_responses(response=chunk, completion_id=completion_id)
@@ -298,13 +379,7 @@ class OpenAiLlm(LlmBaseProvider):
                 "type": "function",
                 "name": tool.name,
                 "description": tool.description,
-                "parameters": {
-                    "type": tool.input_schema.type,
-                    "properties": tool.input_schema.properties.model_dump(),
-                    "required": tool.input_schema.required,
-                    **{k: v for k, v in tool.input_schema.model_dump().items() 
-                    if k not in ["type", "properties", "required"]}
-                }
+                "parameters": tool.input_schema.to_parameters()
             }
 
         return {
@@ -312,13 +387,7 @@ class OpenAiLlm(LlmBaseProvider):
             "function": {
                 "name": tool.name,
                 "description": tool.description,
-                "parameters": {
-                    "type": tool.input_schema.type,
-                    "properties": tool.input_schema.properties.model_dump(),
-                    "required": tool.input_schema.required,
-                    **{k: v for k, v in tool.input_schema.model_dump().items() 
-                       if k not in ["type", "properties", "required"]}
-                }
+                "parameters": tool.input_schema.to_parameters()
             }
         }
 
@@ -420,12 +489,60 @@ class OpenAiLlm(LlmBaseProvider):
             bool: True if valid
             
         Raises:
-            AssertionError: If message structure is invalid
+            ValueError: If message structure is invalid
         """
         if self.use_responses_api:
             ### TODO add protection here later
             return True
 
-        assert message_dict.get("role") in ["user", "system", "assistant", "tool", "developer"], f"{message_dict} 'role' attribute must be one of ['user', 'system', 'assistant', 'tool]"
-        assert message_dict.get("content") is not None or message_dict.get("tool_calls") is not None, f"{message_dict} 'content' or 'tool_calls' attribute is missing"
-        return True
+        return super()._validte_message_dict(message_dict, roles=_OPENAI_MESSAGE_ROLES)
+
+    async def batch_complete_offline(self,
+        prompts :List[Union[str, List[str], List[Dict[str, str]]]],
+        system_prompt :Optional[Union[List[str], str]]=None,
+        json_output :bool=False,
+        poll_interval :float=30)->List[Optional[Union[str, Dict]]]:
+        """
+        Submit prompts through the OpenAI Batch API (half the realtime price, completed within 24h) and wait for the results.
+
+        Args:
+            prompts: Input prompts, each accepted by complete()
+            system_prompt: Optional system prompt shared by every request
+            json_output: Whether to parse outputs as JSON
+            poll_interval: Seconds between batch status checks
+
+        Returns:
+            Outputs in the same order as prompts, None for requests that failed inside the batch
+        """
+        if self.base_url or self.config.base_url:
+            raise NotImplementedError("offline batch completions are only available on the OpenAI api")
+
+        endpoint = "/v1/responses" if self.use_responses_api else "/v1/chat/completions"
+        requests = []
+        for i, prompt in enumerate(prompts):
+            body = self._prepare_completion_args(prompt=prompt, system_prompt=system_prompt, stream=False)
+            body.pop("stream", None)
+            requests.append(json.dumps({"custom_id": str(i), "method": "POST", "url": endpoint, "body": body}))
+
+        batch_file = await self.aclient.files.create(file=("batch.jsonl", "\n".join(requests).encode()), purpose="batch")
+        batch = await self.aclient.batches.create(input_file_id=batch_file.id, endpoint=endpoint, completion_window="24h")
+        while batch.status not in _BATCH_TERMINAL_STATUSES:
+            await asyncio.sleep(poll_interval)
+            batch = await self.aclient.batches.retrieve(batch.id)
+
+        outputs :List[Optional[Union[str, Dict]]] = [None] * len(prompts)
+        if batch.output_file_id is None:
+            return outputs
+
+        response_model = Response if self.use_responses_api else ChatCompletion
+        content = await self.aclient.files.content(batch.output_file_id)
+        for line in content.text.splitlines():
+            if not line:
+                continue
+            result = json.loads(line)
+            response = result.get("response") or {}
+            if result.get("error") or response.get("status_code") != 200:
+                continue
+            output = self._no_stream(response_model.model_validate(response["body"]))
+            outputs[int(result["custom_id"])] = self.extract_json(output) if json_output else output
+        return outputs
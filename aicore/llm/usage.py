@@ -1,14 +1,14 @@
 from aicore.models_metadata import PricingConfig
+from aicore.llm.utils import new_ulid
 
 from pydantic import BaseModel, RootModel, Field, computed_field, model_validator
 from typing import Optional, List, Union
 from datetime import datetime, timezone
 from collections import defaultdict
-from ulid import ulid
 
 class CompletionUsage(BaseModel):
     """Tracks token usage and cost for a single LLM completion."""
-    completion_id: Optional[str] = Field(default_factory=ulid)
+    completion_id: Optional[str] = Field(default_factory=new_ulid)
     prompt_tokens: int
     response_tokens: int
     cached_tokens: int = 0
@@ -3,6 +3,8 @@ from typing import Union
 from pathlib import Path
 import base64
 import httpx
+import time
+import os
 import re
 
 
@@ -125,3 +127,16 @@ def detect_image_type(b64 :str)->str:
         return "webp"
 
     raise ValueError("Unkown Image Type - supported types are ['png', 'jpeg', 'git', 'webp']")
+
+_CROCKFORD_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+# every 10 bit value mapped to its two Crockford chars, 26 chars -> 13 table lookups
+_CROCKFORD_PAIRS = [first + second for first in _CROCKFORD_ALPHABET for second in _CROCKFORD_ALPHABET]
+_ULID_SHIFTS = tuple(range(120, -1, -10))
+
+def new_ulid()->str:
+    """
+    Generate a 26 char ULID (48 bit ms timestamp + 80 random bits), same format as ulid.ulid()
+    without drawing 512 random bytes and encoding one char at a time
+    """
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10), "big")
+    return "".join([_CROCKFORD_PAIRS[(value >> shift) & 1023] for shift in _ULID_SHIFTS])
@@ -12,6 +12,10 @@ import os
 
 from aicore.const import (
     DEFAULT_LOGS_DIR,
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_MIN_BATCH_SIZE,
+    DEFAULT_BATCH_SIZE_GROWTH_FACTOR,
+    DEFAULT_MAX_BATCH_DELAY,
     STREAM_START_TOKEN,
     STREAM_END_TOKEN,
     REASONING_START_TOKEN,
@@ -20,19 +24,19 @@ from aicore.const import (
     TOOL_CALL_END_TOKEN
 )
 
-SPECIAL_TOKENS = [
+SPECIAL_TOKENS = frozenset({
     STREAM_START_TOKEN,
     STREAM_END_TOKEN,
     REASONING_START_TOKEN,
     REASONING_STOP_TOKEN,
     TOOL_CALL_START_TOKEN,
     TOOL_CALL_END_TOKEN,
-]
+})
 
-SPECIAL_END_TOKENS = [
+SPECIAL_END_TOKENS = frozenset({
     STREAM_END_TOKEN,
     REASONING_STOP_TOKEN
-]
+})
     
 def default_stream_handler(message :str)->str:
     if message in SPECIAL_TOKENS:
@@ -179,11 +183,11 @@ class Logger:
                 self.session_queues[session_id] = AsyncQueue()
             
         queue = self.session_queues[session_id]
-        start_time = time.time()
+        start_time = time.monotonic()
         
         while True:
             try:
-                if timeout is not None and time.time() - start_time > timeout:
+                if timeout is not None and time.monotonic() - start_time > timeout:
                     logger.debug(f"Timeout reached for session {session_id}")
                     break
                     
@@ -227,7 +231,7 @@ class Logger:
                     self.queue.task_done()
                     # Start the timer after the first log is extracted
                     if last_log_time is None:
-                        last_log_time = time.time()
+                        last_log_time = time.monotonic()
                     last_log_content = log.message
                     yield log.message
                     if REASONING_STOP_TOKEN in last_log_content:
@@ -251,5 +255,84 @@ class Logger:
                 logger.error(f"Error in pop: {str(e)}")
                 await asyncio.sleep(poll_interval)
 
+class SessionLogger:
+    """
+    Callable that forwards stream chunks to a logger queue under a fixed session id.
+    Chunks are buffered and flushed as a single message on newline, on any special token,
+    once the current batch size is reached or once the oldest buffered chunk has waited max_delay
+    seconds, a timer covers streams that stall before their next chunk. The batch size starts at
+    min_batch_size so the first tokens are emitted promptly and grows by growth_factor after each flush.
+    Call flush() once the stream is over to emit any pending chunks, or aclose() once the logger
+    is no longer used to also wait for a timer flush that is already running.
+    """
+    __slots__ = (
+        "session_id", "log_fn",
+        "batch_size", "min_batch_size", "growth_factor", "max_delay",
+        "_stream_buf", "_current_batch_size", "_buffered_at", "_flush_handle", "_flush_task"
+    )
+
+    def __init__(self,
+            session_id :str,
+            log_fn=None,
+            batch_size :int=DEFAULT_BATCH_SIZE,
+            min_batch_size :int=DEFAULT_MIN_BATCH_SIZE,
+            growth_factor :float=DEFAULT_BATCH_SIZE_GROWTH_FACTOR,
+            max_delay :float=DEFAULT_MAX_BATCH_DELAY):
+        self.session_id = session_id
+        self.log_fn = log_fn or _logger.log_chunk_to_queue
+        self.batch_size = batch_size
+        self.min_batch_size = min(min_batch_size, batch_size)
+        self.growth_factor = growth_factor
+        self.max_delay = max_delay
+        self._stream_buf = []
+        self._current_batch_size = self.min_batch_size
+        self._buffered_at = 0.0
+        self._flush_handle = None
+        self._flush_task = None
+
+    async def __call__(self, message :str):
+        if message in SPECIAL_TOKENS:
+            # special tokens are matched by consumers as standalone messages
+            await self.flush()
+            await self.log_fn(message, self.session_id)
+            if message in SPECIAL_END_TOKENS:
+                self._current_batch_size = self.min_batch_size
+            return
+
+        if not self._stream_buf:
+            self._buffered_at = time.monotonic()
+            # emits the batch even if the stream stalls (or dies) before its next chunk
+            self._flush_handle = asyncio.get_running_loop().call_later(self.max_delay, self._flush_on_timer)
+        self._stream_buf.append(message)
+        if len(self._stream_buf) >= self._current_batch_size \
+            or message.endswith("\n") \
+            or time.monotonic() - self._buffered_at >= self.max_delay:
+            await self.flush()
+            self._current_batch_size = min(int(self._current_batch_size * self.growth_factor) or 1, self.batch_size)
+
+    def _flush_on_timer(self):
+        self._flush_handle = None
+        if self._stream_buf:
+            # referenced until done, the loop only keeps weak references to its tasks
+            self._flush_task = asyncio.get_running_loop().create_task(self.flush())
+
+    async def flush(self):
+        """Emit any buffered chunks as a single message"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._stream_buf:
+            return
+        message = "".join(self._stream_buf)
+        self._stream_buf.clear()
+        await self.log_fn(message, self.session_id)
+
+    async def aclose(self):
+        """Cancel the pending timer and emit any buffered chunks"""
+        await self.flush()
+        if self._flush_task is not None:
+            task, self._flush_task = self._flush_task, None
+            await task
+
 # Global logger instance
 _logger = Logger()
\ No newline at end of file
@@ -1,8 +1,9 @@
-from pydantic import BaseModel, model_validator
+from pydantic import BaseModel, ConfigDict, model_validator
 from datetime import datetime, timedelta
-from typing import Literal, Optional, Dict
+from typing import Literal, Optional, Dict, Tuple
 import pytz
 import json
+import sys
 
 from aicore.const import METADATA_JSON, DEFAULT_ENCODING
 
@@ -76,6 +77,9 @@ class PricingConfig(BaseModel):
     happy_hour: Optional[HappyHour] = None
     avoid_dynamic :bool=False
     dynamic: Optional[DynamicPricing] = None
+
+    # pricing entries are shared across configs (see METADATA), never mutated in place
+    model_config = ConfigDict(frozen=True)
     
     def calculate_cost(self, 
             prompt_tokens: int, 
@@ -110,3 +114,9 @@ METADATA: Dict[str, ModelMetaData] = {
     model: ModelMetaData(**metadata)
     for model, metadata in MODELS_METADATA.items()
 }
+
+# same entries keyed by (provider, model), avoids building the joined "provider-model" key per lookup
+METADATA_BY_PROVIDER_MODEL: Dict[Tuple[str, str], ModelMetaData] = {
+    tuple(sys.intern(part) for part in provider_model.split("-", 1)): metadata
+    for provider_model, metadata in METADATA.items()
+}
@@ -1,25 +1,47 @@
 from aicore.const import DEFAULT_OBSERVABILITY_DIR, DEFAULT_ENCODING
 from aicore.logger import _logger
+from aicore.llm.utils import new_ulid
 
 from pydantic import BaseModel, ConfigDict, RootModel, Field, field_validator, computed_field, model_validator, model_serializer, field_serializer
 from typing import Dict, Any, Optional, List, Set, Union, Literal
 from datetime import datetime, timedelta
 from typing_extensions import Self
 from pathlib import Path
-import aiofiles
+from concurrent.futures import Future, ThreadPoolExecutor
+import threading
 import asyncio
 import orjson
 import json
-import ulid
 import os
 
+# one lock per session directory, shared by every collector of the process
+_SESSION_FILE_LOCKS: Dict[str, threading.Lock] = {}
+_SESSION_FILE_LOCKS_GUARD = threading.Lock()
+# guards the lazy creation of each collector's record writer
+_RECORD_EXECUTOR_LOCK = threading.Lock()
+
+def _session_file_lock(session_dir: Path) -> threading.Lock:
+    key = str(session_dir.resolve())
+    lock = _SESSION_FILE_LOCKS.get(key)
+    if lock is None:
+        with _SESSION_FILE_LOCKS_GUARD:
+            lock = _SESSION_FILE_LOCKS.get(key)
+            if lock is None:
+                lock = _SESSION_FILE_LOCKS[key] = threading.Lock()
+    return lock
+
+def _log_record_failure(future: Future):
+    # nothing waits on background records, surface the failure instead of dropping it with the future
+    if (exception := future.exception()) is not None:
+        _logger.logger.error(f"Error recording completion: {exception!r}")
+
 class LlmOperationRecord(BaseModel):
     """Data model for storing information about a single LLM operation."""
     session_id: Optional[str] = ""
     workspace: Optional[str] = ""
     agent_id: Optional[str] = ""
     action_id: Optional[str] = ""
-    operation_id: str = Field(default_factory=ulid.ulid)
+    operation_id: str = Field(default_factory=new_ulid)
     timestamp: Optional[str] = ""
     operation_type: Literal["completion", "acompletion", "acompletion.tool_call"]
     provider: str
@@ -292,11 +314,12 @@ class LlmOperationCollector(RootModel):
     _is_sessions_initialized :set = set()
     _background_tasks: Set[asyncio.Task] = set()
     _json_storage_enabled: bool = True
+    _is_enabled: bool = True
+    _record_executor: Optional[ThreadPoolExecutor] = None
 
     # Chunked storage configuration
     _chunk_size_limit: int = int(os.environ.get("OBSERVABILITY_CHUNK_SIZE", "50"))
     _session_latest_chunk: Dict[str, int] = {}
-    _session_chunk_locks: Dict[str, asyncio.Lock] = {}
 
     # Connection pool configuration
     _pool_size: int = int(os.environ.get("DB_POOL_SIZE", "10"))
@@ -408,6 +431,14 @@ class LlmOperationCollector(RootModel):
     def storage_path(self, value: Union[str, Path]):
         self._storage_path = value
 
+    @property
+    def is_enabled(self) -> bool:
+        return self._is_enabled
+
+    @is_enabled.setter
+    def is_enabled(self, value: bool):
+        self._is_enabled = value
+
     def _sanitize_session_id(self, session_id: Optional[str]) -> str:
         """Sanitize session_id for safe filesystem usage."""
         if not session_id:
@@ -444,29 +475,6 @@ class LlmOperationCollector(RootModel):
         self._session_latest_chunk[safe_session_id] = max_chunk
         return max_chunk
 
-    async def _a_get_latest_chunk_number(self, session_id: Optional[str]) -> int:
-        """Get the latest chunk number for a session (asynchronous)."""
-        safe_session_id = self._sanitize_session_id(session_id)
-
-        # Check cache first
-        if safe_session_id in self._session_latest_chunk:
-            return self._session_latest_chunk[safe_session_id]
-
-        # List files and find max number
-        session_dir = self._get_session_dir(session_id)
-        if not session_dir.exists():
-            self._session_latest_chunk[safe_session_id] = 0
-            return 0
-
-        chunk_files = list(session_dir.glob("*.json"))
-        if not chunk_files:
-            self._session_latest_chunk[safe_session_id] = 0
-            return 0
-
-        max_chunk = max(int(f.stem) for f in chunk_files)
-        self._session_latest_chunk[safe_session_id] = max_chunk
-        return max_chunk
-
     def _get_chunk_path(self, session_id: Optional[str], chunk_number: int) -> Path:
         """Get the file path for a specific chunk."""
         session_dir = self._get_session_dir(session_id)
@@ -484,19 +492,6 @@ class LlmOperationCollector(RootModel):
             _logger.logger.warning(f"Corrupted or missing chunk file: {chunk_path}")
             return []
 
-    async def _a_load_chunk(self, chunk_path: Path) -> List[Dict[str, Any]]:
-        """Load a chunk file asynchronously and return records as list of dicts."""
-        if not chunk_path.exists() or chunk_path.stat().st_size == 0:
-            return []
-
-        try:
-            async with aiofiles.open(chunk_path, 'rb') as f:
-                content = await f.read()
-                return orjson.loads(content)
-        except (orjson.JSONDecodeError, FileNotFoundError):
-            _logger.logger.warning(f"Corrupted or missing chunk file: {chunk_path}")
-            return []
-
     def _store_to_file(self, new_record: LlmOperationRecord) -> None:
         """Store a new record using chunked, session-based storage.
         Records are organized in directories by session_id with chunked JSON files.
@@ -505,85 +500,21 @@ class LlmOperationCollector(RootModel):
         session_dir = self._get_session_dir(new_record.session_id)
         session_dir.mkdir(parents=True, exist_ok=True)
 
-        # Get the latest chunk number
-        chunk_number = self._get_latest_chunk_number(new_record.session_id)
-        chunk_path = self._get_chunk_path(new_record.session_id, chunk_number)
-
-        # Load current chunk
-        current_chunk = self._load_chunk(chunk_path)
-
-        # Check if chunk is full
-        if len(current_chunk) >= self._chunk_size_limit:
-            # Create new chunk
-            chunk_number += 1
-            safe_session_id = self._sanitize_session_id(new_record.session_id)
-            self._session_latest_chunk[safe_session_id] = chunk_number
-            chunk_path = self._get_chunk_path(new_record.session_id, chunk_number)
-            current_chunk = []
-
-        # Append new record
-        current_chunk.append(new_record.model_dump())
-
-        # Write chunk atomically using temp file
-        temp_path = chunk_path.with_suffix('.tmp')
-        try:
-            with open(temp_path, 'wb') as f:
-                f.write(orjson.dumps(current_chunk, option=orjson.OPT_INDENT_2))
-            # Atomic rename
-            temp_path.replace(chunk_path)
-        except Exception as e:
-            _logger.logger.error(f"Error writing chunk file {chunk_path}: {str(e)}")
-            if temp_path.exists():
-                temp_path.unlink()
-
-            # Fallback: try to save just the new record to a separate fallback file
-            try:
-                fallback_dir = self._get_session_dir(new_record.session_id) / "fallback"
-                fallback_dir.mkdir(parents=True, exist_ok=True)
-
-                # Create fallback file with timestamp to avoid conflicts
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-                fallback_path = fallback_dir / f"record_{timestamp}.json"
-
-                with open(fallback_path, 'wb') as f:
-                    f.write(orjson.dumps(new_record.model_dump(), option=orjson.OPT_INDENT_2))
-
-                _logger.logger.warning(
-                    f"Saved record to fallback file {fallback_path} due to chunk write failure. "
-                    f"Original error: {str(e)}"
-                )
-            except Exception as fallback_error:
-                _logger.logger.error(
-                    f"CRITICAL: Failed to save record even to fallback storage. "
-                    f"Data may be lost. Original error: {str(e)}, Fallback error: {str(fallback_error)}"
-                )
-
-    async def _a_store_to_file(self, new_record: LlmOperationRecord) -> None:
-        """Async version of chunked, session-based storage.
-        Records are organized in directories by session_id with chunked JSON files.
-        """
-        # Get session directory and ensure it exists
-        session_dir = self._get_session_dir(new_record.session_id)
-        session_dir.mkdir(parents=True, exist_ok=True)
-
-        # Get or create lock for this session
-        safe_session_id = self._sanitize_session_id(new_record.session_id)
-        if safe_session_id not in self._session_chunk_locks:
-            self._session_chunk_locks[safe_session_id] = asyncio.Lock()
-
-        # Use lock to prevent concurrent writes to the same session
-        async with self._session_chunk_locks[safe_session_id]:
+        # complete writes from the telemetry thread and acomplete from the loop, the read / append / replace
+        # of a chunk must not interleave for one session directory whichever collector or thread writes it
+        with _session_file_lock(session_dir):
             # Get the latest chunk number
-            chunk_number = await self._a_get_latest_chunk_number(new_record.session_id)
+            chunk_number = self._get_latest_chunk_number(new_record.session_id)
             chunk_path = self._get_chunk_path(new_record.session_id, chunk_number)
 
             # Load current chunk
-            current_chunk = await self._a_load_chunk(chunk_path)
+            current_chunk = self._load_chunk(chunk_path)
 
             # Check if chunk is full
             if len(current_chunk) >= self._chunk_size_limit:
                 # Create new chunk
                 chunk_number += 1
+                safe_session_id = self._sanitize_session_id(new_record.session_id)
                 self._session_latest_chunk[safe_session_id] = chunk_number
                 chunk_path = self._get_chunk_path(new_record.session_id, chunk_number)
                 current_chunk = []
@@ -594,9 +525,9 @@ class LlmOperationCollector(RootModel):
             # Write chunk atomically using temp file
             temp_path = chunk_path.with_suffix('.tmp')
             try:
-                async with aiofiles.open(temp_path, 'wb') as f:
-                    await f.write(orjson.dumps(current_chunk, option=orjson.OPT_INDENT_2))
-                # Atomic rename (sync operation, but fast)
+                with open(temp_path, 'wb') as f:
+                    f.write(orjson.dumps(current_chunk, option=orjson.OPT_INDENT_2))
+                # Atomic rename
                 temp_path.replace(chunk_path)
             except Exception as e:
                 _logger.logger.error(f"Error writing chunk file {chunk_path}: {str(e)}")
@@ -612,8 +543,8 @@ class LlmOperationCollector(RootModel):
                     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
                     fallback_path = fallback_dir / f"record_{timestamp}.json"
 
-                    async with aiofiles.open(fallback_path, 'wb') as f:
-                        await f.write(orjson.dumps(new_record.model_dump(), option=orjson.OPT_INDENT_2))
+                    with open(fallback_path, 'wb') as f:
+                        f.write(orjson.dumps(new_record.model_dump(), option=orjson.OPT_INDENT_2))
 
                     _logger.logger.warning(
                         f"Saved record to fallback file {fallback_path} due to chunk write failure. "
@@ -829,7 +760,7 @@ class LlmOperationCollector(RootModel):
         latency_ms: Optional[float] = None,
         error_message: Optional[str] = None,
         extras: Optional[Dict[str, Any]] = None
-    ) -> LlmOperationRecord:
+    ) -> Optional[LlmOperationRecord]:
         # Clean request args
         cleaned_args = self._clean_completion_args(completion_args)
 
@@ -862,55 +793,6 @@ class LlmOperationCollector(RootModel):
 
         return record
 
-    async def _a_handle_record(
-        self,
-        completion_args: Dict[str, Any],
-        operation_type: Literal["completion", "acompletion"],
-        provider: str,
-        response: Optional[Union[str, Dict[str, str]]] = None,
-        session_id: Optional[str] = None,
-        workspace: Optional[str] = None,
-        agent_id: Optional[str] = None,
-        action_id: Optional[str] = None,
-        input_tokens: Optional[int] = 0,
-        output_tokens: Optional[int] = 0,
-        cached_tokens: Optional[int] = 0,
-        cost: Optional[float] = 0,
-        latency_ms: Optional[float] = None,
-        error_message: Optional[str] = None,
-        extras: Optional[Dict[str, Any]] = None
-    ) -> LlmOperationRecord:
-        # Clean request args
-        cleaned_args = self._clean_completion_args(completion_args)
-
-        if not isinstance(response, (str, dict, list)) and response is not None:
-            return None
-
-        # Build a record
-        record = LlmOperationRecord(
-            session_id=session_id,
-            agent_id=agent_id,
-            action_id=action_id,
-            workspace=workspace,
-            provider=provider,
-            operation_type=operation_type,
-            input_tokens=input_tokens,
-            output_tokens=output_tokens if not cached_tokens else output_tokens + cached_tokens,
-            cached_tokens=cached_tokens,
-            cost=cost,
-            latency_ms=latency_ms or 0,
-            error_message=error_message,
-            completion_args=cleaned_args,
-            response=response,
-            extras=extras or {}
-        )
-        # Only write to JSON file if JSON storage is enabled and storage_path is set
-        if self._json_storage_enabled and self.storage_path:
-            await self._a_store_to_file(record)
-
-        self.root.append(record)
-        return record
-
     def record_completion(
         self,
         completion_args: Dict[str, Any],
@@ -928,7 +810,11 @@ class LlmOperationCollector(RootModel):
         latency_ms: Optional[float] = None,
         error_message: Optional[str] = None,
         extras: Optional[str] = None
-    ) -> LlmOperationRecord:
+    ) -> Optional[LlmOperationRecord]:
+        # skip cleaning and serializing the request / response entirely when collection is off
+        if not self._is_enabled:
+            return None
+
         # Create record
         record = self._handle_record(
             completion_args, operation_type, provider, response, 
@@ -944,6 +830,48 @@ class LlmOperationCollector(RootModel):
         
         return record
     
+    def _get_record_executor(self) -> ThreadPoolExecutor:
+        if self._record_executor is None:
+            with _RECORD_EXECUTOR_LOCK:
+                if self._record_executor is None:
+                    # a single worker writes the records in the order they were submitted
+                    self._record_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="aicore-records")
+        return self._record_executor
+
+    def submit_record(self, **record) -> Future:
+        """
+        Queue a record_completion call on this collector's writer thread and return its future,
+        which resolves to None when collection is disabled or the response cannot be recorded.
+        Records still queued at interpreter exit are written before it exits, call close() to stop
+        waiting on them earlier.
+        """
+        future = self._get_record_executor().submit(self.record_completion, **record)
+        future.add_done_callback(_log_record_failure)
+        return future
+
+    def flush(self):
+        """Block until every queued record is written."""
+        if (executor := self._record_executor) is not None:
+            # the worker runs in submission order, once this no-op is done everything queued before is too
+            executor.submit(int).result()
+
+    async def aflush(self):
+        """Wait for every queued record to be written."""
+        if (executor := self._record_executor) is not None:
+            await asyncio.wrap_future(executor.submit(int))
+
+    def close(self):
+        """Write the queued records and stop the writer thread, a later record starts a new one."""
+        executor, self._record_executor = self._record_executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    async def aclose(self):
+        """Async version of close()."""
+        executor, self._record_executor = self._record_executor, None
+        if executor is not None:
+            await asyncio.to_thread(executor.shutdown, wait=True)
+
     async def arecord_completion_into_db(self, record :LlmOperationRecord):
         if not self._table_initialized:
                 await self.create_tables()
@@ -969,13 +897,18 @@ class LlmOperationCollector(RootModel):
         latency_ms: Optional[float] = None,
         error_message: Optional[str] = None,
         extras: Optional[str] = None
-    ) -> LlmOperationRecord:
-        # Create record asynchronously
-        record = await self._a_handle_record(
+    ) -> Optional[LlmOperationRecord]:
+        # skip cleaning and serializing the request / response entirely when collection is off
+        if not self._is_enabled:
+            return None
+
+        # written by the same ordered worker as the records queued with submit_record
+        record = await asyncio.wrap_future(self._get_record_executor().submit(
+            self._handle_record,
             completion_args, operation_type, provider, response,
             session_id, workspace, agent_id, action_id,
             input_tokens, output_tokens, cached_tokens, cost, latency_ms, error_message, extras
-        )
+        ))
         
         if self._async_engine and self._async_session_factory and record:
             # Fire and forget - create task without awaiting
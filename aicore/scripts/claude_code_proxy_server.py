@@ -1071,7 +1071,7 @@ def build_app(args: argparse.Namespace):
             {k: v for k, v in opts_dict.items() if k not in ("system_prompt",)},
         )
 
-        start_time = time.time()
+        start_time = time.perf_counter()
 
         async def stream_generator() -> AsyncGenerator[str, None]:
             global _active_streams
@@ -1100,7 +1100,7 @@ def build_app(args: argparse.Namespace):
                 err_payload = to_json({"message": str(exc), "exit_code": getattr(exc, "exit_code", None)})
                 yield _make_sse_frame("error", err_payload)
             finally:
-                duration_ms = (time.time() - start_time) * 1000
+                duration_ms = (time.perf_counter() - start_time) * 1000
                 logger.info(
                     "Query done  | session_id=%s cost_usd=%s turns=%d duration_ms=%.2f",
                     session_id or "n/a",
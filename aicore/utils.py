@@ -149,18 +149,12 @@ def retry_on_failure(func):
 
     if asyncio.iscoroutinefunction(func):
         # Async version
+        # Apply the retry decorator once at decoration time instead of on every call
+        retry_func = retry_decorator(func)
+
         @wraps(func)
         async def async_wrapper(*args, **kwargs):
             try:
-                # Apply the retry decorator to a local async function
-                @retry_decorator
-                async def retry_func(*inner_args, **inner_kwargs):
-                    try:
-                        return await func(*inner_args, **inner_kwargs)
-                    except KeyboardInterrupt:
-                        # Immediately break out of retry loop on KeyboardInterrupt
-                        raise
-                
                 return await retry_func(*args, **kwargs)
             except asyncio.CancelledError:
                 raise
@@ -188,18 +182,11 @@ def retry_on_failure(func):
         return async_wrapper
     else:
         # Sync version (same pattern as async)
+        retry_func = retry_decorator(func)
+
         @wraps(func)
         def sync_wrapper(*args, **kwargs):
             try:
-                # Apply the retry decorator
-                @retry_decorator
-                def retry_func(*inner_args, **inner_kwargs):
-                    try:
-                        return func(*inner_args, **inner_kwargs)
-                    except KeyboardInterrupt:
-                        # Immediately break out of retry loop
-                        raise
-                
                 return retry_func(*args, **kwargs)
             except KeyboardInterrupt:
                 # Always propagate KeyboardInterrupt without logging
@@ -0,0 +1,139 @@
+import os
+import pytest
+
+from aicore.config import Config, set_default_config_path, _YAML_CACHE
+
+
+CONFIG_YAML = """
+llm:
+  provider: "openai"
+  api_key: "test_key"
+  model: "gpt-4o"
+  temperature: 0.5
+"""
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    """Fixture for a minimal yaml config file"""
+    path = tmp_path / "config.yml"
+    path.write_text(CONFIG_YAML)
+    _YAML_CACHE.clear()
+    yield path
+    _YAML_CACHE.clear()
+
+
+def test_from_yaml(config_file):
+    config = Config.from_yaml(config_file)
+    assert config.llm.provider == "openai"
+    assert config.llm.model == "gpt-4o"
+    assert config.llm.temperature == 0.5
+
+
+def test_from_yaml_missing_file(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        Config.from_yaml(tmp_path / "missing.yml")
+
+
+def test_from_yaml_is_cached(config_file):
+    first = Config.from_yaml(config_file)
+    assert len(_YAML_CACHE) == 1
+    second = Config.from_yaml(config_file)
+    assert len(_YAML_CACHE) == 1
+    assert first.llm is not second.llm
+    assert first.llm == second.llm
+
+
+def test_from_yaml_cache_invalidated_on_change(config_file):
+    Config.from_yaml(config_file)
+    config_file.write_text(CONFIG_YAML.replace("gpt-4o", "gpt-4o-mini"))
+    stat = os.stat(config_file)
+    os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    config = Config.from_yaml(config_file)
+    assert config.llm.model == "gpt-4o-mini"
+    # the stale parse is replaced, not kept alongside
+    assert len(_YAML_CACHE) == 1
+
+
+def test_from_yaml_extras_do_not_leak_into_cache(config_file):
+    config_file.write_text(CONFIG_YAML + '  extra_headers:\n    x-test: "1"\n')
+    first = Config.from_yaml(config_file)
+    first.llm.extra_headers.update({"x-added": "2"})
+    second = Config.from_yaml(config_file)
+    assert second.llm.extra_headers == {"x-test": "1"}
+
+
+def test_construct_from_yaml_matches_validated(config_file):
+    config = Config.from_yaml(config_file)
+    constructed = Config.construct_from_yaml({
+        "llm": {"provider": "openai", "api_key": "test_key", "model": "gpt-4o", "temperature": 0.5}
+    })
+    assert constructed.llm == config.llm
+    assert constructed.llm.pricing == config.llm.pricing
+    assert constructed.llm.context_window == config.llm.context_window
+
+
+def test_construct_from_yaml_builds_embeddings_pricing():
+    from aicore.models_metadata import PricingConfig
+    constructed = Config.construct_from_yaml({
+        "embeddings": {"provider": "openai", "api_key": "test_key", "model": "text-embedding-3-small", "pricing": {"input": 0.02}}
+    })
+    assert isinstance(constructed.embeddings.pricing, PricingConfig)
+    assert constructed.embeddings.pricing.input == 0.02
+
+
+def test_construct_from_yaml_checks_temperature():
+    with pytest.raises(AssertionError):
+        Config.construct_from_yaml({
+            "llm": {"provider": "openai", "api_key": "test_key", "model": "gpt-4o", "temperature": 2}
+        })
+
+
+def test_from_environment(monkeypatch):
+    for key in ("EMBEDDINGS_PROVIDER", "EMBEDDINGS_API_KEY", "EMBEDDINGS_MODEL"):
+        monkeypatch.delenv(key, raising=False)
+    monkeypatch.setenv("LLM_PROVIDER", "openai")
+    monkeypatch.setenv("LLM_API_KEY", "test_key")
+    monkeypatch.setenv("LLM_MODEL", "gpt-4o")
+    monkeypatch.setenv("LLM_TEMPERATURE", "0.2")
+    config = Config.from_environment()
+    assert config.embeddings is None
+    assert config.llm.model == "gpt-4o"
+    assert config.llm.temperature == 0.2
+
+
+def test_from_environment_requires_a_config(monkeypatch):
+    for key in ("EMBEDDINGS_PROVIDER", "EMBEDDINGS_API_KEY", "EMBEDDINGS_MODEL", "LLM_PROVIDER", "LLM_API_KEY", "LLM_MODEL"):
+        monkeypatch.delenv(key, raising=False)
+    with pytest.raises(ValueError):
+        Config.from_environment()
+
+
+def test_from_environment_partial_group(monkeypatch):
+    for key in ("EMBEDDINGS_PROVIDER", "EMBEDDINGS_MODEL", "LLM_PROVIDER", "LLM_API_KEY", "LLM_MODEL"):
+        monkeypatch.delenv(key, raising=False)
+    monkeypatch.setenv("EMBEDDINGS_API_KEY", "test_key")
+    with pytest.raises(ValueError, match="EMBEDDINGS_PROVIDER"):
+        Config.from_environment()
+
+
+def test_from_yaml_rejects_oversized_file(config_file, monkeypatch):
+    monkeypatch.setattr("aicore.config.MAX_CONFIG_BYTES", 10)
+    with pytest.raises(ValueError, match="exceeding"):
+        Config.from_yaml(config_file)
+
+
+def test_set_default_config_path(config_file, monkeypatch):
+    import aicore.config
+    monkeypatch.setattr(aicore.config, "DEFAULT_CONFIG_PATH", aicore.config.DEFAULT_CONFIG_PATH)
+    set_default_config_path(config_file)
+    assert Config.from_yaml().llm.model == "gpt-4o"
+
+
+def test_llm_config_provider_model_follows_model():
+    from aicore.llm.config import LlmConfig
+    config = LlmConfig(provider="openai", api_key="test_key", model="gpt-4o")
+    assert config.provider_model == "openai-gpt-4o"
+    assert config.model_copy(update={"model": "gpt-4o-mini"}).provider_model == "openai-gpt-4o-mini"
+    config.model = "gpt-4.1"
+    assert config.provider_model == "openai-gpt-4.1"
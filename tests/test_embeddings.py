@@ -28,17 +28,18 @@ def mock_base_provider():
 # It checks if the provider is correctly set and if the vector dimensions are correctly retrieved.
 # The test uses monkeypatch to mock the from_config method of the provider.
 def test_embeddings_initialization(mock_embeddings_config, mock_base_provider, monkeypatch):
-    monkeypatch.setattr(Providers.OPENAI.value, "from_config", MagicMock(return_value=mock_base_provider))
+    monkeypatch.setattr(Providers.OPENAI.provider_cls, "from_config", MagicMock(return_value=mock_base_provider))
     embeddings = Embeddings.from_config(mock_embeddings_config)
     assert embeddings.provider == mock_base_provider
     assert embeddings.vector_dimensions == 1536
-    Providers.OPENAI.value.from_config.assert_called_once_with(mock_embeddings_config)
+    Providers.OPENAI.provider_cls.from_config.assert_called_once_with(mock_embeddings_config)
+
 
 # Test case to verify the generate method of the Embeddings class.
 # It checks if the generate method of the provider is called correctly and if the result is as expected.
 # The test uses monkeypatch to mock the from_config method of the provider.
 def test_embeddings_generate(mock_embeddings_config, mock_base_provider, monkeypatch):
-    monkeypatch.setattr(Providers.OPENAI.value, "from_config", MagicMock(return_value=mock_base_provider))
+    monkeypatch.setattr(Providers.OPENAI.provider_cls, "from_config", MagicMock(return_value=mock_base_provider))
     embeddings = Embeddings.from_config(mock_embeddings_config)
     text_batches = ["text1", "text2"]
     mock_base_provider.generate.return_value = ["vector1", "vector2"]
@@ -51,7 +52,7 @@ def test_embeddings_generate(mock_embeddings_config, mock_base_provider, monkeyp
 # The test uses monkeypatch to mock the from_config method of the provider.
 @pytest.mark.asyncio
 async def test_embeddings_agenerate(mock_embeddings_config, mock_base_provider, monkeypatch):
-    monkeypatch.setattr(Providers.OPENAI.value, "from_config", MagicMock(return_value=mock_base_provider))
+    monkeypatch.setattr(Providers.OPENAI.provider_cls, "from_config", MagicMock(return_value=mock_base_provider))
     embeddings = Embeddings.from_config(mock_embeddings_config)
     text_batches = ["text1", "text2"]
     mock_base_provider.agenerate.return_value = ["vector1", "vector2"]
@@ -63,7 +64,7 @@ async def test_embeddings_agenerate(mock_embeddings_config, mock_base_provider,
 # It checks if the provider can be set to a new provider and if the vector dimensions are updated accordingly.
 # The test uses monkeypatch to mock the from_config method of the provider.
 def test_embeddings_provider_setter(mock_embeddings_config, mock_base_provider, monkeypatch):
-    monkeypatch.setattr(Providers.OPENAI.value, "from_config", MagicMock(return_value=mock_base_provider))
+    monkeypatch.setattr(Providers.OPENAI.provider_cls, "from_config", MagicMock(return_value=mock_base_provider))
     embeddings = Embeddings.from_config(mock_embeddings_config)
     new_mock_provider = MagicMock(spec=EmbeddingsBaseProvider)
     new_mock_provider.vector_dimensions = 2048
@@ -75,4 +76,18 @@ def test_embeddings_provider_setter(mock_embeddings_config, mock_base_provider,
 # It checks if the config is correctly set when creating an Embeddings instance from a config.
 def test_embeddings_from_config(mock_embeddings_config):
     embeddings = Embeddings.from_config(mock_embeddings_config)
-    assert embeddings.config == mock_embeddings_config
\ No newline at end of file
+    assert embeddings.config == mock_embeddings_config
+
+
+def test_embeddings_providers_are_imported_on_use():
+    import subprocess
+    import sys
+    # a fresh interpreter, the sdks may already be loaded by other tests in this one
+    code = (
+        "import sys\n"
+        "from aicore.embeddings.embeddings import Embeddings, Providers\n"
+        "assert 'mistralai' not in sys.modules and 'aicore.embeddings.providers.mistral' not in sys.modules\n"
+        "assert Providers.MISTRAL.provider_cls.__name__ == 'MistralEmbeddings'\n"
+        "assert 'aicore.embeddings.providers.mistral' in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
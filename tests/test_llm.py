@@ -2,7 +2,11 @@ import pytest
 from unittest.mock import MagicMock, AsyncMock, patch
 from aicore.llm.llm import Llm
 from aicore.llm.config import LlmConfig
+import asyncio
 import json
+import math
+import re
+
 
 class MockResponse:
     def __init__(self, chunks, usage=None):
@@ -57,6 +61,13 @@ class MockUsage:
 def MockGeminiTokenizer(content):
     return [_ for _ in content.split(" ")]
 
+
+@pytest.fixture(autouse=True)
+def observability_dir(monkeypatch, tmp_path):
+    # providers build their collector lazily from the env, keep their records out of the cwd
+    monkeypatch.setenv("OBSERVABILITY_DATA_ROOT", str(tmp_path / "observability_data"))
+
+
 @pytest.fixture
 def mock_openai(*args, **kwargs):
     mock_openai = MagicMock()
@@ -222,4 +233,657 @@ async def test_llm_tokenizer(mock_validate_config, provider_name, llm_config_ope
     # Assert that the tokenizer returns a list
     assert isinstance(tokens, list)
     # Assert that the list of tokens is not empty
-    assert len(tokens) > 0
\ No newline at end of file
+    assert len(tokens) > 0
+
+
+@patch('aicore.llm.providers.base_provider.LlmBaseProvider.validate_config')
+@pytest.mark.asyncio
+async def test_llm_acomplete_batch(mock_validate_config, llm_config_openai):
+    mock_validate_config.return_value = None
+    llm = Llm.from_config(llm_config_openai)
+
+    in_flight = 0
+    max_in_flight = 0
+    async def _acomplete(self, prompt, **kwargs):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return f"{prompt} {kwargs.get('stream')}"
+
+    prompts = [f"prompt {i}" for i in range(6)]
+    with patch.object(Llm, "acomplete", _acomplete):
+        responses = await llm.acomplete_batch(prompts, max_concurrency=2, stream=False)
+
+    assert responses == [f"{prompt} False" for prompt in prompts]
+    assert max_in_flight == 2
+
+
+@patch('aicore.llm.providers.base_provider.LlmBaseProvider.validate_config')
+@pytest.mark.asyncio
+async def test_llm_acomplete_batch_return_exceptions(mock_validate_config):
+    llm = Llm.from_config(LlmConfig(provider="anthropic", api_key="test_key", model="claude-sonnet-4-5"))
+
+    async def _acomplete(self, prompt, **kwargs):
+        if prompt == "bad":
+            raise ValueError(prompt)
+        return prompt
+
+    with patch.object(Llm, "acomplete", _acomplete):
+        responses = await llm.acomplete_batch(["good", "bad"], return_exceptions=True)
+        with pytest.raises(ValueError):
+            await llm.acomplete_batch(["good", "bad"])
+
+    assert responses[0] == "good"
+    assert isinstance(responses[1], ValueError)
+
+
+@patch('aicore.llm.providers.base_provider.LlmBaseProvider.validate_config')
+@pytest.mark.asyncio
+async def test_llm_acomplete_batch_keeps_usage_per_item(mock_validate_config):
+    from aicore.llm.providers.anthropic import AnthropicLlm
+    llm = Llm.from_config(LlmConfig(provider="anthropic", api_key="test_key", model="claude-sonnet-4-5"))
+    records = []
+
+    async def acompletion_fn(**kwargs):
+        n = int(re.search(r"prompt (\d+)", json.dumps(kwargs["messages"])).group(1))
+        # later prompts answer first so the items interleave
+        await asyncio.sleep(0.001 * (10 - n))
+        return n
+
+    def no_stream(self, n):
+        self.usage.record_completion(prompt_tokens=n, response_tokens=2 * n, completion_id=f"item-{n}")
+        return f"answer {n}"
+
+    async def arecord_completion(self, **record):
+        records.append(record)
+
+    llm.provider.acompletion_fn = acompletion_fn
+    with patch.object(AnthropicLlm, "_no_stream", no_stream), \
+        patch("aicore.observability.collector.LlmOperationCollector.arecord_completion", arecord_completion):
+        responses = await llm.acomplete_batch([f"prompt {n}" for n in range(10)], max_concurrency=4)
+
+    assert responses == [f"answer {n}" for n in range(10)]
+    assert llm.usage.total_tokens == sum(3 * n for n in range(10))
+    assert sorted((record["input_tokens"], record["output_tokens"], record["response"]) for record in records) == [
+        (n, 2 * n, f"answer {n}") for n in range(10)
+    ]
+
+    with pytest.raises(ValueError, match="stream=False"):
+        await llm.acomplete_batch(["prompt 0"], stream=True)
+    llm.provider.tools = [{"name": "tool"}]
+    with pytest.raises(ValueError, match="tool"):
+        await llm.acomplete_batch(["prompt 0"])
+
+
+@patch('aicore.llm.providers.base_provider.LlmBaseProvider.validate_config')
+@pytest.mark.asyncio
+async def test_llm_acomplete_uses_a_session_logger_per_call(mock_validate_config):
+    from aicore.logger import SessionLogger
+    llm = Llm.from_config(LlmConfig(provider="anthropic", api_key="test_key", model="claude-sonnet-4-5"))
+    handlers = []
+
+    async def acomplete(self, *args):
+        handlers.append(args[7])
+        return "response"
+
+    with patch.object(type(llm.provider), "acomplete", acomplete):
+        await asyncio.gather(llm.acomplete("first"), llm.acomplete("second"))
+        # a custom logger_fn is shared and left open
+        custom = AsyncMock()
+        llm.logger_fn = custom
+        await llm.acomplete("third")
+
+    assert all(isinstance(handler, SessionLogger) for handler in handlers[:2])
+    assert handlers[0] is not handlers[1]
+    assert handlers[0].session_id == handlers[1].session_id == llm.session_id
+    assert handlers[-1] is custom
+    custom.aclose.assert_not_called()
+
+
+def test_anthropic_count_tokens_is_cached():
+    from aicore.llm.providers.anthropic import AnthropicLlm, _TOKEN_COUNT_CACHE
+    _TOKEN_COUNT_CACHE.clear()
+    client = MagicMock()
+    client.messages.count_tokens = MagicMock(return_value=MagicMock(input_tokens=5))
+
+    first = AnthropicLlm.anthropic_count_tokens("Hi there", client=client, model="claude-sonnet-4-5")
+    second = AnthropicLlm.anthropic_count_tokens("Hi there", client=client, model="claude-sonnet-4-5")
+
+    assert len(first) == len(second) == 5
+    client.messages.count_tokens.assert_called_once()
+    AnthropicLlm.anthropic_count_tokens("Hi there", client=client, model="claude-opus-4-1")
+    assert client.messages.count_tokens.call_count == 2
+    _TOKEN_COUNT_CACHE.clear()
+
+
+def test_anthropic_count_tokens_cache_is_thread_safe():
+    from concurrent.futures import ThreadPoolExecutor
+    from aicore.llm.providers.anthropic import AnthropicLlm, _TOKEN_COUNT_CACHE
+    _TOKEN_COUNT_CACHE.clear()
+    client = MagicMock()
+    client.messages.count_tokens = MagicMock(return_value=MagicMock(input_tokens=1))
+
+    # every thread evicts from a full cache at once
+    with patch("aicore.llm.providers.anthropic.TOKEN_COUNT_CACHE_SIZE", 4), ThreadPoolExecutor(max_workers=8) as executor:
+        counts = list(executor.map(
+            lambda i: len(AnthropicLlm.anthropic_count_tokens(f"text {i}", client=client, model="claude-sonnet-4-5")),
+            range(200)
+        ))
+    assert counts == [1] * 200
+    assert len(_TOKEN_COUNT_CACHE) <= 4
+    _TOKEN_COUNT_CACHE.clear()
+
+
+def test_anthropic_count_tokens_cache_evicts_least_recently_used():
+    from aicore.llm.providers.anthropic import AnthropicLlm, _TOKEN_COUNT_CACHE
+    _TOKEN_COUNT_CACHE.clear()
+    client = MagicMock()
+    client.messages.count_tokens = MagicMock(return_value=MagicMock(input_tokens=1))
+
+    def count(text):
+        return AnthropicLlm.anthropic_count_tokens(text, client=client, model="claude-sonnet-4-5")
+
+    with patch("aicore.llm.providers.anthropic.TOKEN_COUNT_CACHE_SIZE", 2):
+        count("first")
+        count("second")
+        # the hit makes "first" the most recent entry, "second" is evicted instead
+        count("first")
+        count("third")
+        assert client.messages.count_tokens.call_count == 3
+        count("first")
+        assert client.messages.count_tokens.call_count == 3
+        count("second")
+        assert client.messages.count_tokens.call_count == 4
+    _TOKEN_COUNT_CACHE.clear()
+
+
+@patch('aicore.llm.providers.base_provider.LlmBaseProvider.validate_config')
+def test_anthropic_clients_are_shared(mock_validate_config):
+    from aicore.llm.providers.anthropic import AnthropicLlm, close_all_clients
+    config = LlmConfig(provider="anthropic", api_key="test_key", model="claude-sonnet-4-5")
+
+    first = AnthropicLlm.from_config(config)
+    second = AnthropicLlm.from_config(config)
+    other = AnthropicLlm.from_config(LlmConfig(provider="anthropic", api_key="other_key", model="claude-sonnet-4-5"))
+
+    assert first.client is second.client
+    assert first.client is not other.client
+    close_all_clients()
+
+
+@patch('aicore.llm.providers.base_provider.LlmBaseProvider.validate_config')
+@pytest.mark.asyncio
+async def test_anthropic_async_clients_are_released(mock_validate_config):
+    from aicore.llm.providers.anthropic import AnthropicLlm, _ACLIENTS
+    config = LlmConfig(provider="anthropic", api_key="test_key", model="claude-sonnet-4-5")
+
+    # built outside of a running loop, the provider keeps a dedicated client
+    dedicated = await asyncio.to_thread(AnthropicLlm.from_config, config)
+    first = AnthropicLlm.from_config(config)
+    second = AnthropicLlm.from_config(config)
+    assert first._aclient is second._aclient
+    assert dedicated._aclient is not first._aclient
+
+    await dedicated.aclose()
+    assert dedicated._aclient.is_closed()
+    # shared clients outlive the providers closing them
+    await first.aclose()
+    assert not second._aclient.is_closed()
+
+    await Llm.aclose_shared_clients()
+    assert second._aclient.is_closed()
+    assert asyncio.get_running_loop() not in _ACLIENTS
+
+
+@patch('aicore.llm.providers.base_provider.LlmBaseProvider.validate_config')
+def test_openai_clients_are_shared(mock_validate_config, llm_config_openai):
+    from aicore.llm.providers.openai import OpenAiLlm, close_all_clients
+    first = OpenAiLlm.from_config(llm_config_openai)
+    second = OpenAiLlm.from_config(llm_config_openai)
+    other = OpenAiLlm.from_config(LlmConfig(provider="openai", api_key="other_key", model=llm_config_openai.model))
+
+    assert first.client is second.client
+    assert first.client is not other.client
+    close_all_clients()
+
+
+def test_no_print_in_providers():
+    """Debug prints in provider code run on every request or streamed chunk."""
+    import ast
+    from pathlib import Path
+    import aicore.llm.providers
+
+    providers_dir = Path(aicore.llm.providers.__file__).parent
+    offenders = []
+    for path in providers_dir.rglob("*.py"):
+        # oauth prints the authorization url for the user on purpose
+        if path.name == "oauth.py":
+            continue
+        for node in ast.walk(ast.parse(path.read_text(encoding="utf8"))):
+            if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == "print":
+                offenders.append(f"{path.relative_to(providers_dir)}:{node.lineno}")
+    assert offenders == []
+
+
+@patch('aicore.llm.providers.base_provider.LlmBaseProvider.validate_config')
+def test_anthropic_system_blocks_are_cached(mock_validate_config):
+    from aicore.llm.providers.anthropic import AnthropicLlm
+    provider = AnthropicLlm.from_config(LlmConfig(provider="anthropic", api_key="test_key", model="claude-sonnet-4-5"))
+
+    first, second, other = {}, {}, {}
+    provider._handle_special_sys_prompt_anthropic(first, ["system", "rules"])
+    provider._handle_special_sys_prompt_anthropic(second, ["system", "rules"])
+    provider._handle_special_sys_prompt_anthropic(other, "other system")
+
+    assert first["system"] is second["system"]
+    assert [block["text"] for block in first["system"]] == ["system", "rules"]
+    assert [block["text"] for block in other["system"]] == ["other system"]
+
+
+@patch('aicore.llm.providers.base_provider.LlmBaseProvider.validate_config')
+def test_anthropic_tool_chunk_dispatch(mock_validate_config):
+    from types import SimpleNamespace
+    from aicore.llm.providers.anthropic import AnthropicLlm
+    provider = AnthropicLlm.from_config(LlmConfig(provider="anthropic", api_key="test_key", model="claude-sonnet-4-5"))
+
+    tool_use = SimpleNamespace(type="tool_use", id="call_1", name="search")
+    json_delta = SimpleNamespace(type="input_json_delta", partial_json='{"q": 1}')
+    start = SimpleNamespace(type="content_block_start", content_block=tool_use)
+    delta = SimpleNamespace(type="content_block_delta", delta=json_delta)
+    text = SimpleNamespace(type="content_block_delta", delta=SimpleNamespace(type="text_delta", text="hi"))
+
+    assert provider._tool_chunk_from_provider(start) is tool_use
+    assert provider._tool_chunk_from_provider(delta) is json_delta
+    assert provider._tool_chunk_from_provider(text) is None
+    assert provider._is_tool_call(start) and provider._is_tool_call(delta)
+    assert not provider._is_tool_call(text)
+
+
+@patch('aicore.llm.providers.base_provider.LlmBaseProvider.validate_config')
+def test_anthropic_normalize_dispatch(mock_validate_config):
+    from types import SimpleNamespace
+    from aicore.llm.providers.anthropic import AnthropicLlm
+    provider = AnthropicLlm.from_config(LlmConfig(provider="anthropic", api_key="test_key", model="claude-sonnet-4-5"))
+
+    usage = SimpleNamespace(input_tokens=10, output_tokens=1, cache_creation_input_tokens=0, cache_read_input_tokens=4)
+    start = SimpleNamespace(type="message_start", message=SimpleNamespace(id="msg_1", usage=usage))
+    with patch.object(type(provider.usage), "record_completion") as record_completion:
+        assert provider.normalize(start) is None
+    assert record_completion.call_args.kwargs["cached_tokens"] == 4
+
+    delta = SimpleNamespace(type="content_block_delta", delta=SimpleNamespace(type="text_delta", text="hi"))
+    assert provider.normalize(delta) is delta
+    tool_start = SimpleNamespace(type="content_block_start", content_block=SimpleNamespace(type="tool_use"))
+    assert provider.normalize(tool_start) is tool_start
+    assert provider.normalize(SimpleNamespace(type="content_block_start", content_block=SimpleNamespace(type="text"))) is None
+    assert provider.normalize(SimpleNamespace(type="message_stop")) is None
+
+
+def test_img_to_base64_keeps_order(tmp_path):
+    import base64
+    from aicore.llm.providers.base_provider import LlmBaseProvider
+    paths = []
+    for i in range(4):
+        path = tmp_path / f"img_{i}.png"
+        path.write_bytes(f"image {i}".encode())
+        paths.append(path)
+
+    expected = [base64.b64encode(f"image {i}".encode()).decode() for i in range(4)]
+    assert LlmBaseProvider._img_to_base64(paths) == expected
+    assert asyncio.run(LlmBaseProvider._aimg_to_base64(paths)) == expected
+    assert LlmBaseProvider._img_to_base64(paths[0]) == expected[:1]
+    assert LlmBaseProvider._img_to_base64(tuple(paths)) == expected
+    assert asyncio.run(LlmBaseProvider._aimg_to_base64(None)) is None
+
+
+def test_img_to_base64_is_cached_until_modified(tmp_path):
+    import base64
+    import os
+    from aicore.llm.providers import base_provider
+    from aicore.llm.providers.base_provider import LlmBaseProvider, _clear_image_cache
+    _clear_image_cache()
+    path = tmp_path / "img.png"
+    path.write_bytes(b"before")
+
+    with patch("aicore.llm.providers.base_provider.image_to_base64", wraps=base_provider.image_to_base64) as encode:
+        assert LlmBaseProvider._img_to_base64(path) == [base64.b64encode(b"before").decode()]
+        assert LlmBaseProvider._img_to_base64(str(path)) == [base64.b64encode(b"before").decode()]
+        assert encode.call_count == 1
+
+        path.write_bytes(b"after")
+        mtime = os.path.getmtime(path) + 1
+        os.utime(path, (mtime, mtime))
+        assert LlmBaseProvider._img_to_base64(path) == [base64.b64encode(b"after").decode()]
+    # the edited file replaced its previous encoding
+    assert len(base_provider._IMAGE_CACHE) == 1
+
+    encoded = base64.b64encode(b"raw").decode()
+    assert LlmBaseProvider._img_to_base64([encoded, b"raw"]) == [encoded, encoded]
+    _clear_image_cache()
+
+
+def test_img_cache_is_bounded_by_bytes(tmp_path):
+    from aicore.llm.providers import base_provider
+    from aicore.llm.providers.base_provider import LlmBaseProvider, _clear_image_cache
+    _clear_image_cache()
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"img_{i}.png"
+        path.write_bytes(bytes(30))
+        paths.append(path)
+
+    # each image encodes to 40 characters, only two fit
+    with patch.object(base_provider, "IMAGE_CACHE_MAX_BYTES", 100):
+        LlmBaseProvider._img_to_base64(paths[0])
+        LlmBaseProvider._img_to_base64(paths[1])
+        LlmBaseProvider._img_to_base64(paths[2])
+    assert list(base_provider._IMAGE_CACHE) == [str(paths[1]), str(paths[2])]
+    assert base_provider._image_cache_bytes == 80
+
+    with patch.object(base_provider, "IMAGE_CACHE_MAX_BYTES", 0):
+        _clear_image_cache()
+        LlmBaseProvider._img_to_base64(paths[0])
+    assert not base_provider._IMAGE_CACHE
+
+
+def test_extract_json():
+    from aicore.llm.providers.base_provider import LlmBaseProvider
+    assert LlmBaseProvider.extract_json('```json\n{"a": [1, 2]}\n```') == {"a": [1, 2]}
+    # orjson rejects or rounds these, json parses them as before
+    assert math.isnan(LlmBaseProvider.extract_json('{"a": NaN}')["a"])
+    assert LlmBaseProvider.extract_json('```json\n{"a": Infinity}\n```') == {"a": float("inf")}
+    assert LlmBaseProvider.extract_json(f'{{"a": {2**70}}}') == {"a": 2**70}
+    assert LlmBaseProvider.extract_json("not json") == "not json"
+    # bare json is parsed as is, fences inside its strings are not mistaken for a code block
+    assert LlmBaseProvider.extract_json('{"code": "```py\\nx = 1\\n```"}') == {"code": "```py\nx = 1\n```"}
+
+
+def test_default_encoding_is_shared():
+    from aicore.llm.providers.base_provider import LlmBaseProvider, _encoding_for_model
+    _encoding_for_model.cache_clear()
+    with patch("aicore.llm.providers.base_provider.tiktoken.encoding_for_model", side_effect=lambda name: MagicMock()) as encoding_for_model:
+        first = LlmBaseProvider.get_default_encoding("gpt-4o")
+        second = LlmBaseProvider.get_default_encoding("gpt-4o")
+    assert first is second
+    encoding_for_model.assert_called_once_with("gpt-4o")
+    _encoding_for_model.cache_clear()
+
+
+@patch('aicore.llm.providers.base_provider.LlmBaseProvider.validate_config')
+def test_map_multiple_prompts_roles(mock_validate_config):
+    from aicore.llm.providers.anthropic import AnthropicLlm
+    provider = AnthropicLlm.from_config(LlmConfig(provider="anthropic", api_key="test_key", model="claude-sonnet-4-5"))
+
+    messages = provider._map_multiple_prompts(["first", "second", "third"])
+    assert [message["role"] for message in messages] == ["user", "assistant", "user"]
+
+    answer = {"role": "assistant", "content": "hello"}
+    messages = provider._map_multiple_prompts(["hi", answer, "question"])
+    assert [message["role"] for message in messages] == ["user", "assistant", "user"]
+    assert messages[1] is answer
+
+
+def test_model_to_str_is_compact():
+    from pydantic import BaseModel
+    from aicore.llm.providers.base_provider import LlmBaseProvider
+
+    class Answer(BaseModel):
+        value: int
+
+    assert LlmBaseProvider.model_to_str(Answer(value=1)) == '```json\n{"value":1}\n```'
+
+
+@patch('aicore.llm.providers.base_provider.LlmBaseProvider.validate_config')
+@pytest.mark.asyncio
+async def test_llm_acomplete_yield_chunks(mock_validate_config):
+    llm = Llm.from_config(LlmConfig(provider="anthropic", api_key="test_key", model="claude-sonnet-4-5"))
+
+    async def _acomplete(self, prompt, system_prompt, prefix_prompt, img_path, json_output, stream, as_message_records, stream_handler, *args):
+        for chunk in ("Hello", " ", "world"):
+            await stream_handler(chunk)
+        return "Hello world"
+
+    async def _failing_acomplete(self, *args):
+        raise RuntimeError("provider failure")
+
+    with patch.object(type(llm.provider), "acomplete", _acomplete):
+        chunks = [chunk async for chunk in await llm.acomplete("Hi", yield_chunks=True)]
+    assert chunks == ["Hello", " ", "world"]
+
+    with patch.object(type(llm.provider), "acomplete", _failing_acomplete):
+        with pytest.raises(RuntimeError, match="provider failure"):
+            async for _ in await llm.acomplete("Hi", yield_chunks=True):
+                pass
+
+
+@patch('aicore.llm.providers.base_provider.LlmBaseProvider.validate_config')
+@pytest.mark.asyncio
+async def test_openai_batch_complete_offline(mock_validate_config, llm_config_openai):
+    from types import SimpleNamespace
+    llm = Llm.from_config(llm_config_openai)
+
+    def _result(custom_id, content):
+        return json.dumps({"custom_id": custom_id, "response": {"status_code": 200, "body": {
+            "id": "chatcmpl-1", "object": "chat.completion", "created": 0, "model": "gpt-4",
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}]
+        }}})
+
+    aclient = MagicMock()
+    aclient.files.create = AsyncMock(return_value=SimpleNamespace(id="file-in"))
+    aclient.batches.create = AsyncMock(return_value=SimpleNamespace(id="batch-1", status="in_progress", output_file_id=None))
+    aclient.batches.retrieve = AsyncMock(return_value=SimpleNamespace(id="batch-1", status="completed", output_file_id="file-out"))
+    failed = json.dumps({"custom_id": "2", "response": None, "error": {"message": "failed"}})
+    aclient.files.content = AsyncMock(return_value=SimpleNamespace(text="\n".join([_result("1", "second"), _result("0", "first"), failed])))
+    llm.provider.aclient = aclient
+
+    outputs = await llm.batch_complete_offline(["a", "b", "c"], poll_interval=0)
+
+    assert outputs == ["first", "second", None]
+    requests = aclient.files.create.call_args.kwargs["file"][1].decode().splitlines()
+    assert [json.loads(request)["body"]["messages"][-1]["content"][0]["text"] for request in requests] == ["a", "b", "c"]
+    assert "stream" not in json.loads(requests[0])["body"]
+
+
+@patch('aicore.llm.providers.base_provider.LlmBaseProvider.validate_config')
+def test_completion_args_template_keeps_stream_options(mock_validate_config, llm_config_openai):
+    llm = Llm.from_config(llm_config_openai)
+    provider = llm.provider
+
+    args = provider.completion_args_template("Hi", stream=False)
+    assert "stream_options" not in args
+    args = provider.completion_args_template("Hi", stream=True)
+    assert args["stream_options"] == {"include_usage": True}
+    assert provider.completion_args["stream_options"] == {"include_usage": True}
+
+
+@patch('aicore.llm.providers.base_provider.LlmBaseProvider.validate_config')
+def test_response_cache(mock_validate_config, tmp_path):
+    from aicore.llm.providers.anthropic import AnthropicLlm
+    from aicore.observability.collector import LlmOperationCollector
+    provider = AnthropicLlm.from_config(LlmConfig(provider="anthropic", api_key="test_key", model="claude-sonnet-4-5", response_cache_size=1))
+    provider.completion_fn = MagicMock(return_value="response")
+    provider.tokenizer_fn = MagicMock(side_effect=AssertionError("cache hits must not count tokens"))
+    provider.collector = LlmOperationCollector.fom_observable_storage_path(str(tmp_path))
+
+    def no_stream(self, response):
+        call_count = provider.completion_fn.call_count
+        provider.usage.record_completion(prompt_tokens=10 * call_count, response_tokens=call_count, completion_id=str(call_count))
+        return f"{response} {call_count}"
+
+    with patch.object(AnthropicLlm, "_no_stream", no_stream):
+        assert provider.complete("Hi", stream=False) == "response 1"
+        assert provider.complete("Hi", stream=False) == "response 1"
+        assert provider.complete("Other", stream=False) == "response 2"
+        # evicted by the size 1 cache
+        assert provider.complete("Hi", stream=False) == "response 3"
+        assert asyncio.run(provider.acomplete("Hi", stream=False)) == "response 3"
+
+    assert provider.completion_fn.call_count == 3
+    provider.flush_records()
+    records = provider.collector.root
+    assert [record.operation_type for record in records] == ["completion", "completion", "completion", "completion", "acompletion"]
+    assert [record.extras.get("cached", False) for record in records] == [False, True, False, False, True]
+    assert records[1].cost == 0 and records[1].response == "response 1"
+    # hits replay the tokens reported for the original request, the prompt counted as cached
+    assert [(record.input_tokens, record.cached_tokens) for record in records[1::3]] == [(10, 10), (30, 30)]
+    provider.tokenizer_fn.assert_not_called()
+
+
+@patch('aicore.llm.providers.base_provider.LlmBaseProvider.validate_config')
+def test_response_cache_key_skips_non_json_args(mock_validate_config):
+    from aicore.llm.providers.anthropic import AnthropicLlm
+    provider = AnthropicLlm.from_config(LlmConfig(provider="anthropic", api_key="test_key", model="claude-sonnet-4-5", response_cache_size=1))
+    args = {"model": "claude-sonnet-4-5", "messages": [{"role": "user", "content": "Hi"}]}
+
+    assert provider._response_cache_key(args) == provider._response_cache_key(dict(reversed(args.items())))
+    assert provider._response_cache_key({**args, "model": "claude-opus-4-1"}) != provider._response_cache_key(args)
+    # objects only have a lossy str() form, these requests are not cached
+    assert provider._response_cache_key({**args, "response_format": LlmConfig}) is None
+    assert provider._response_cache_key({**args, "extra": b"raw"}) is None
+
+
+def test_validate_message_dict():
+    from aicore.llm.providers.base_provider import LlmBaseProvider
+    assert LlmBaseProvider._validte_message_dict({"role": "user", "content": "Hi"})
+    assert LlmBaseProvider._validte_message_dict({"role": "assistant", "tool_calls": []})
+    with pytest.raises(ValueError, match="role"):
+        LlmBaseProvider._validte_message_dict({"role": "developer", "content": "Hi"})
+    with pytest.raises(ValueError, match="content"):
+        LlmBaseProvider._validte_message_dict({"role": "user"})
+
+
+@patch('aicore.llm.providers.base_provider.LlmBaseProvider.validate_config')
+def test_provider_usage_and_collector_are_cached(mock_validate_config):
+    from aicore.llm.usage import UsageInfo
+    from aicore.llm.providers.anthropic import AnthropicLlm
+    provider = AnthropicLlm.from_config(LlmConfig(provider="anthropic", api_key="test_key", model="claude-sonnet-4-5"))
+
+    assert provider.usage is provider.usage
+    usage = UsageInfo()
+    provider.usage = usage
+    assert provider.usage is usage
+    assert "usage" not in provider.model_dump()
+
+    with patch("aicore.llm.providers.base_provider.LlmOperationCollector.fom_observable_storage_path") as from_path:
+        collector = provider.collector
+        assert provider.collector is collector
+        from_path.assert_called_once()
+    provider.disable_collection()
+    assert collector.is_enabled is False
+
+    # disabling an unused collector does not create it, the flag is applied once it is
+    provider = AnthropicLlm.from_config(LlmConfig(provider="anthropic", api_key="test_key", model="claude-sonnet-4-5"))
+    with patch("aicore.llm.providers.base_provider.LlmOperationCollector.fom_observable_storage_path") as from_path:
+        provider.disable_collection()
+        from_path.assert_not_called()
+        assert provider.collector.is_enabled is False
+
+
+@patch('aicore.llm.providers.base_provider.LlmBaseProvider.validate_config')
+def test_collector_is_created_once_across_threads(mock_validate_config):
+    import threading
+    import time
+    from aicore.llm.providers.anthropic import AnthropicLlm
+    provider = AnthropicLlm.from_config(LlmConfig(provider="anthropic", api_key="test_key", model="claude-sonnet-4-5"))
+
+    class SlowReleaseLock:
+        """Widens the window between leaving the lock and cached_property storing the value"""
+        def __init__(self):
+            self._lock = threading.Lock()
+
+        def __enter__(self):
+            self._lock.acquire()
+
+        def __exit__(self, *args):
+            self._lock.release()
+            time.sleep(0.05)
+
+    collectors = []
+    with patch("aicore.llm.providers.base_provider._COLLECTOR_LOCK", SlowReleaseLock()), \
+        patch("aicore.llm.providers.base_provider.LlmOperationCollector.fom_observable_storage_path", side_effect=lambda: MagicMock()) as from_path:
+        threads = [threading.Thread(target=lambda: collectors.append(provider.collector)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        from_path.assert_called_once()
+    assert all(collector is provider.collector for collector in collectors)
+
+
+@patch('aicore.llm.providers.base_provider.LlmBaseProvider.validate_config')
+def test_completion_records_are_written_in_background(mock_validate_config):
+    import threading
+    from aicore.llm.providers.anthropic import AnthropicLlm
+    from aicore.observability.collector import LlmOperationCollector
+    provider = AnthropicLlm.from_config(LlmConfig(provider="anthropic", api_key="test_key", model="claude-sonnet-4-5"))
+    provider.completion_fn = MagicMock(return_value="response")
+    provider.acompletion_fn = AsyncMock(return_value="response")
+    release = threading.Event()
+    provider.collector = LlmOperationCollector()
+
+    with patch.object(AnthropicLlm, "_no_stream", lambda self, response: response), \
+        patch.object(LlmOperationCollector, "record_completion", side_effect=lambda **kwargs: release.wait(5)) as record_completion, \
+        patch.object(LlmOperationCollector, "arecord_completion", new_callable=AsyncMock) as arecord_completion:
+        # returns while the record is still being written
+        assert provider.complete("Hi", stream=False) == "response"
+        release.set()
+        provider.flush_records()
+        record_completion.assert_called_once()
+
+        assert asyncio.run(provider.acomplete("Hi", stream=False)) == "response"
+    arecord_completion.assert_awaited_once()
+    assert arecord_completion.await_args.kwargs["operation_type"] == "acompletion"
+
+
+@patch('aicore.llm.providers.base_provider.LlmBaseProvider.validate_config')
+def test_completion_records_survive_loop_shutdown(mock_validate_config, tmp_path):
+    from aicore.llm.providers.anthropic import AnthropicLlm
+    from aicore.observability.collector import LlmOperationCollector
+    provider = AnthropicLlm.from_config(LlmConfig(provider="anthropic", api_key="test_key", model="claude-sonnet-4-5"))
+    provider.acompletion_fn = AsyncMock(return_value="response")
+    provider.collector = LlmOperationCollector.fom_observable_storage_path(str(tmp_path))
+
+    with patch.object(AnthropicLlm, "_no_stream", lambda self, response: response):
+        # the loop is closed as soon as acomplete returns
+        assert asyncio.run(provider.acomplete("Hi", stream=False)) == "response"
+
+    session_dir = tmp_path / provider.session_id
+    assert [path.name for path in session_dir.iterdir()] == ["0.json"]
+    assert json.loads((session_dir / "0.json").read_text())[0]["operation_type"] == "acompletion"
+
+
+@patch('aicore.llm.providers.base_provider.LlmBaseProvider.validate_config')
+def test_sync_and_async_records_share_the_session_chunk(mock_validate_config, tmp_path):
+    from aicore.llm.providers.anthropic import AnthropicLlm
+    from aicore.observability.collector import LlmOperationCollector
+    provider = AnthropicLlm.from_config(LlmConfig(provider="anthropic", api_key="test_key", model="claude-sonnet-4-5"))
+    provider.completion_fn = MagicMock(return_value="response")
+    provider.acompletion_fn = AsyncMock(return_value="response")
+    provider.collector = LlmOperationCollector.fom_observable_storage_path(str(tmp_path))
+
+    with patch.object(AnthropicLlm, "_no_stream", lambda self, response: response):
+        # both records go through the collector's single ordered writer
+        provider.complete("Hi", stream=False)
+        asyncio.run(provider.acomplete("Hello", stream=False))
+        provider.flush_records()
+
+    records = json.loads((tmp_path / provider.session_id / "0.json").read_text())
+    assert [record["operation_type"] for record in records] == ["completion", "acompletion"]
+
+
+@patch('aicore.llm.providers.base_provider.LlmBaseProvider.validate_config')
+def test_background_record_failures_are_logged(mock_validate_config):
+    from aicore.llm.providers.anthropic import AnthropicLlm
+    from aicore.observability.collector import LlmOperationCollector
+    provider = AnthropicLlm.from_config(LlmConfig(provider="anthropic", api_key="test_key", model="claude-sonnet-4-5"))
+    provider.collector = LlmOperationCollector()
+
+    with patch.object(LlmOperationCollector, "record_completion", side_effect=ValueError("invalid record")), \
+        patch("aicore.observability.collector._logger.logger.error") as log_error:
+        future = provider._record_in_background(provider="anthropic", operation_type="completion", completion_args={})
+        provider.flush_records()
+    assert isinstance(future.exception(), ValueError)
+    log_error.assert_called_once()
+    assert "invalid record" in log_error.call_args.args[0]
@@ -1,4 +1,5 @@
 import os
+import asyncio
 import ulid
 import json
 import pytest
@@ -159,6 +160,25 @@ class TestLlmOperationCollectorFileStorage:
         assert record.output_tokens == 5
         assert record.latency_ms == 150.0
 
+    def test_record_completion_disabled(self):
+        """Test that a disabled collector records nothing."""
+        collector = LlmOperationCollector()
+        collector.is_enabled = False
+        record = collector.record_completion(
+            completion_args={"model": "gpt-4", "messages": [{"role": "user", "content": "Hello"}]},
+            operation_type="completion",
+            provider="openai",
+            response="Test response"
+        )
+        assert record is None
+        assert asyncio.run(collector.arecord_completion(
+            completion_args={"model": "gpt-4", "messages": [{"role": "user", "content": "Hello"}]},
+            operation_type="acompletion",
+            provider="openai",
+            response="Test response"
+        )) is None
+        assert len(collector.root) == 0
+
     def test_clean_completion_args(self):
         """Test cleaning of sensitive information from completion arguments."""
         collector = LlmOperationCollector()
@@ -582,4 +602,21 @@ def test_polars_from_db(monkeypatch, tmp_path):
     assert not df.is_empty()
     expected_cols = ["session_id", "workspace", "agent_id", "action_id", "operation_id"]
     for col in expected_cols:
-        assert col in df.columns
\ No newline at end of file
+        assert col in df.columns
+
+def test_submit_record_is_written_on_close(tmp_path):
+    """Queued records are written in submission order and the writer stops on close."""
+    collector = LlmOperationCollector.fom_observable_storage_path(str(tmp_path))
+    for operation_type in ("completion", "acompletion"):
+        collector.submit_record(
+            completion_args={"model": "gpt-4", "messages": [{"role": "user", "content": "Hello"}]},
+            operation_type=operation_type,
+            provider="openai",
+            response="Hi",
+            session_id="queued_session"
+        )
+    collector.close()
+
+    assert collector._record_executor is None
+    records = json.loads((tmp_path / "queued_session" / "0.json").read_text())
+    assert [record["operation_type"] for record in records] == ["completion", "acompletion"]
@@ -95,4 +95,85 @@ async def test_reasoning_stop_token(logger):
     
     assert len(received_messages) == 2
     assert REASONING_STOP_TOKEN in received_messages[1]
-    assert messages[2] not in received_messages
\ No newline at end of file
+    assert messages[2] not in received_messages
+
+
+@pytest.mark.asyncio
+async def test_session_logger_batches_chunks(logger):
+    """Test that SessionLogger coalesces chunks and keeps special tokens standalone."""
+    from aicore.logger import SessionLogger, STREAM_START_TOKEN, STREAM_END_TOKEN
+
+    session_id = "test_session"
+    session_logger = SessionLogger(session_id, log_fn=logger.log_chunk_to_queue, batch_size=4, min_batch_size=2, growth_factor=2)
+
+    await session_logger(STREAM_START_TOKEN)
+    for chunk in ["a", "b", "c", "d", "e", "f", "g"]:
+        await session_logger(chunk)
+    await session_logger(STREAM_END_TOKEN)
+
+    messages = [entry.message for entry in logger.get_all_logs_in_queue()]
+    assert messages == [STREAM_START_TOKEN, "ab", "cdef", "g", STREAM_END_TOKEN]
+    assert all(entry.session_id == session_id for entry in logger.get_all_logs_in_queue())
+
+
+@pytest.mark.asyncio
+async def test_session_logger_flush(logger):
+    """Test that flush emits pending chunks."""
+    from aicore.logger import SessionLogger
+
+    session_logger = SessionLogger("test_session", log_fn=logger.log_chunk_to_queue, batch_size=10, min_batch_size=10)
+    await session_logger("partial ")
+    assert logger.get_all_logs_in_queue() == []
+    await session_logger("line\n")
+    await session_logger("tail")
+    await session_logger.flush()
+
+    assert [entry.message for entry in logger.get_all_logs_in_queue()] == ["partial line\n", "tail"]
+
+
+@pytest.mark.asyncio
+async def test_session_logger_flushes_delayed_batch(logger):
+    """Test that a batch pending for max_delay is flushed with the next chunk."""
+    from unittest.mock import patch
+    from aicore.logger import SessionLogger
+
+    # only the logger's clock is faked, max_delay is long enough for the real flush timer not to fire
+    session_logger = SessionLogger("test_session", log_fn=logger.log_chunk_to_queue, batch_size=10, min_batch_size=10, max_delay=5.0)
+    with patch("aicore.logger.time") as fake_time:
+        fake_time.monotonic.side_effect = [0.0, 1.0, 2.0, 6.0, 10.0, 11.0]
+        await session_logger("a")
+        await session_logger("b")
+        assert logger.get_all_logs_in_queue() == []
+        # slow model, the batch has been waiting past max_delay
+        await session_logger("c")
+        await session_logger("d")
+        await session_logger.flush()
+
+    assert [entry.message for entry in logger.get_all_logs_in_queue()] == ["abc", "d"]
+
+
+@pytest.mark.asyncio
+async def test_session_logger_flushes_stalled_batch(logger):
+    """Test that a pending batch is flushed after max_delay even if no other chunk arrives."""
+    from aicore.logger import SessionLogger
+
+    session_logger = SessionLogger("test_session", log_fn=logger.log_chunk_to_queue, batch_size=10, min_batch_size=10, max_delay=0.01)
+    await session_logger("stalled")
+    assert logger.get_all_logs_in_queue() == []
+    await asyncio.sleep(0.05)
+
+    assert [entry.message for entry in logger.get_all_logs_in_queue()] == ["stalled"]
+
+
+@pytest.mark.asyncio
+async def test_session_logger_aclose_cancels_timer(logger):
+    """Test that aclose emits the pending batch once and cancels its timer."""
+    from aicore.logger import SessionLogger
+
+    session_logger = SessionLogger("test_session", log_fn=logger.log_chunk_to_queue, batch_size=10, min_batch_size=10, max_delay=0.01)
+    await session_logger("pending")
+    await session_logger.aclose()
+    assert session_logger._flush_handle is None
+    await asyncio.sleep(0.05)
+
+    assert [entry.message for entry in logger.get_all_logs_in_queue()] == ["pending"]
@@ -10,6 +10,12 @@ from aicore.llm.config import LlmConfig
 from aicore.llm.llm import Llm
 
 
+@pytest.fixture(autouse=True)
+def observability_dir(monkeypatch, tmp_path):
+    """Keep the records written by the providers' collectors out of the working tree"""
+    monkeypatch.setenv("OBSERVABILITY_DATA_ROOT", str(tmp_path / "observability_data"))
+
+
 @pytest.fixture
 def static_pricing_config():
     """Fixture for static pricing configuration"""
@@ -343,4 +343,20 @@ async def test_decorator_order_handling_async():
 #     assert len(results) == 3
 #     assert "attempt1" in results
 #     assert "attempt2" in results
-#     assert "success" in results
\ No newline at end of file
+#     assert "success" in results
+
+
+def test_new_ulid():
+    from aicore.llm.utils import new_ulid, _CROCKFORD_ALPHABET
+
+    before_ms = time.time_ns() // 1_000_000
+    value = new_ulid()
+    after_ms = time.time_ns() // 1_000_000
+
+    assert len(value) == 26
+    assert set(value) <= set(_CROCKFORD_ALPHABET)
+    decoded = 0
+    for char in value:
+        decoded = decoded * 32 + _CROCKFORD_ALPHABET.index(char)
+    assert before_ms <= decoded >> 80 <= after_ms
+    assert new_ulid() != value